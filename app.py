@@ -1,16 +1,21 @@
-try:
-    from gifmaker_app.main import main
-except ModuleNotFoundError as exc:
-    if exc.name and exc.name.startswith("PySide6"):
-        raise SystemExit(
-            "PySide6 Qt modules are unavailable in this Python interpreter.\n"
-            "Run with the project venv interpreter instead, for example:\n"
-            "  /home/rob/tools/.venv/bin/python app.py <video-file>\n"
-            "or activate the venv and run:\n"
-            "  source /home/rob/tools/.venv/bin/activate && python app.py <video-file>"
-        )
-    raise
+from gifmaker_app.main import main
+
+
+def _run() -> int:
+    # Qt is imported inside main() on the GUI path, so a missing PySide6 only shows up once it runs.
+    try:
+        return main()
+    except ModuleNotFoundError as exc:
+        if exc.name and exc.name.startswith("PySide6"):
+            raise SystemExit(
+                "PySide6 Qt modules are unavailable in this Python interpreter.\n"
+                "Run with the project venv interpreter instead, for example:\n"
+                "  /home/rob/tools/.venv/bin/python app.py <video-file>\n"
+                "or activate the venv and run:\n"
+                "  source /home/rob/tools/.venv/bin/activate && python app.py <video-file>"
+            )
+        raise
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(_run())
@@ -1,6 +1,13 @@
 """GIF Maker application package."""
 
 from .main import main
-from .main_window import GifMakerWindow
 
 __all__ = ["main", "GifMakerWindow"]
+
+
+def __getattr__(name: str):
+    if name == "GifMakerWindow":
+        from .main_window import GifMakerWindow
+
+        return GifMakerWindow
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
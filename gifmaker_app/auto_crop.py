@@ -0,0 +1,83 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+AUTO_CROP_SAMPLES = 12
+# Rows/columns darker than this (mean luma) with little spatial detail count as letterbox.
+DARK_LEVEL = 24.0
+DARK_DETAIL = 6.0
+# Rows/columns whose pixels change less than this across the samples count as static chrome.
+STATIC_RANGE = 6.0
+# Static trimming is discarded if it would leave less than this share of either dimension.
+MIN_CONTENT_FRACTION = 0.3
+
+
+def _luma(frame: np.ndarray) -> np.ndarray:
+    if frame.ndim == 2:
+        return frame
+    return (frame @ np.array([77, 150, 29], dtype=np.uint16) >> 8).astype(np.uint8)
+
+
+def _border_run(border: np.ndarray) -> tuple[int, int]:
+    # Length of the border run at each end of a boolean line mask.
+    inner = np.flatnonzero(~border)
+    if inner.size == 0:
+        return len(border), 0
+    return int(inner[0]), int(len(border) - 1 - inner[-1])
+
+
+def _trim(border: np.ndarray) -> tuple[int, int] | None:
+    lead, tail = _border_run(border)
+    if lead + tail >= len(border):
+        return None
+    return lead, len(border) - tail
+
+
+def detect_content_rect(frames: Sequence[np.ndarray]) -> tuple[int, int, int, int] | None:
+    if not frames:
+        return None
+    first = _luma(frames[0])
+    height, width = first.shape
+    row_mean = np.zeros(height, dtype=np.float32)
+    row_detail = np.zeros(height, dtype=np.float32)
+    col_mean = np.zeros(width, dtype=np.float32)
+    col_detail = np.zeros(width, dtype=np.float32)
+    low = first.copy()
+    high = first.copy()
+
+    # Keep the worst case per line across samples so one bright frame is enough to keep a line.
+    for frame in frames:
+        luma = _luma(frame)
+        np.maximum(row_mean, luma.mean(axis=1, dtype=np.float32), out=row_mean)
+        np.maximum(row_detail, luma.std(axis=1, dtype=np.float32), out=row_detail)
+        np.maximum(col_mean, luma.mean(axis=0, dtype=np.float32), out=col_mean)
+        np.maximum(col_detail, luma.std(axis=0, dtype=np.float32), out=col_detail)
+        np.minimum(low, luma, out=low)
+        np.maximum(high, luma, out=high)
+
+    row_dark = (row_mean < DARK_LEVEL) & (row_detail < DARK_DETAIL)
+    col_dark = (col_mean < DARK_LEVEL) & (col_detail < DARK_DETAIL)
+    temporal_range = high - low
+    row_static = temporal_range.mean(axis=1, dtype=np.float32) < STATIC_RANGE
+    col_static = temporal_range.mean(axis=0, dtype=np.float32) < STATIC_RANGE
+
+    rows = _trim(row_dark | row_static)
+    cols = _trim(col_dark | col_static)
+    fits = (
+        rows is not None
+        and cols is not None
+        and rows[1] - rows[0] >= height * MIN_CONTENT_FRACTION
+        and cols[1] - cols[0] >= width * MIN_CONTENT_FRACTION
+    )
+    if not fits:
+        # Mostly static footage (tripod shots, slides) would lose real content; fall back to black bars only.
+        rows = _trim(row_dark)
+        cols = _trim(col_dark)
+        if rows is None or cols is None:
+            return None
+
+    top, bottom = rows
+    left, right = cols
+    if (top, bottom, left, right) == (0, height, 0, width):
+        return None
+    return left, top, right - left, bottom - top
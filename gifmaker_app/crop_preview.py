@@ -1,8 +1,14 @@
-import numpy as np
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from PySide6.QtCore import QPointF, Qt, Signal
 from PySide6.QtGui import QColor, QImage, QPainter, QPen, QPixmap
 from PySide6.QtWidgets import QWidget
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class CropPreviewWidget(QWidget):
     cropChanged = Signal(int, int, int, int)
@@ -17,6 +23,7 @@ class CropPreviewWidget(QWidget):
         self.setMouseTracking(True)
 
         self._image_pixmap: QPixmap | None = None
+        self._playback_pixmap: QPixmap | None = None
         self._source_width = 0
         self._source_height = 0
 
@@ -46,6 +53,18 @@ class CropPreviewWidget(QWidget):
             self.set_source_size(w, h)
         self.update()
 
+    def set_playback_frame(self, rgb: np.ndarray | None) -> None:
+        if rgb is None:
+            self._playback_pixmap = None
+        else:
+            h, w, _ = rgb.shape
+            image = QImage(rgb.data, w, h, 3 * w, QImage.Format_RGB888).copy()
+            self._playback_pixmap = QPixmap.fromImage(image)
+        self.update()
+
+    def is_playing(self) -> bool:
+        return self._playback_pixmap is not None
+
     def crop_rect(self) -> tuple[int, int, int, int] | None:
         if self._source_width <= 0 or self._source_height <= 0:
             return None
@@ -99,8 +118,12 @@ class CropPreviewWidget(QWidget):
         if image_rect is None:
             return QPointF(0, 0)
 
-        left, top, _, _, scale = image_rect
-        return QPointF(left + sx * scale, top + sy * scale)
+        # The pixmap may be the low-resolution scrub frame, so scale from source pixels to the drawn size.
+        left, top, draw_w, draw_h, _ = image_rect
+        return QPointF(
+            left + sx * draw_w / max(1, self._source_width),
+            top + sy * draw_h / max(1, self._source_height),
+        )
 
     def _widget_to_source(self, wx: float, wy: float) -> tuple[float, float]:
         image_rect = self._display_image_rect()
@@ -123,6 +146,19 @@ class CropPreviewWidget(QWidget):
         painter.setRenderHint(QPainter.Antialiasing, True)
         painter.fillRect(self.rect(), QColor("#111"))
 
+        if self._playback_pixmap is not None:
+            scaled = self._playback_pixmap.scaled(
+                self.rect().adjusted(self.VIEW_MARGIN, self.VIEW_MARGIN, -self.VIEW_MARGIN, -self.VIEW_MARGIN).size(),
+                Qt.KeepAspectRatio,
+                Qt.SmoothTransformation,
+            )
+            painter.drawPixmap(
+                (self.width() - scaled.width()) // 2,
+                (self.height() - scaled.height()) // 2,
+                scaled,
+            )
+            return
+
         if self._image_pixmap is None:
             painter.setPen(QColor("#ddd"))
             painter.drawText(self.rect(), Qt.AlignCenter, "Open a video to begin")
@@ -198,7 +234,7 @@ class CropPreviewWidget(QWidget):
         self.update()
 
     def mousePressEvent(self, event) -> None:
-        if event.button() != Qt.LeftButton or self._image_pixmap is None:
+        if event.button() != Qt.LeftButton or self._image_pixmap is None or self.is_playing():
             return
 
         self._drag_corner = None
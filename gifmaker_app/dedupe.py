@@ -0,0 +1,36 @@
+from collections.abc import Sequence
+
+import cv2
+import numpy as np
+
+DUPLICATE_THRESHOLD = 1.5
+PROBE_WIDTH = 64
+
+
+def _probe(frame: np.ndarray) -> np.ndarray:
+    h, w, _ = frame.shape
+    if w <= PROBE_WIDTH:
+        return frame.astype(np.int16)
+    height = max(1, int(h * (PROBE_WIDTH / w)))
+    return cv2.resize(frame, (PROBE_WIDTH, height), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+def find_unique_frames(
+    frames: Sequence[np.ndarray],
+    threshold: float = DUPLICATE_THRESHOLD,
+) -> tuple[list[int], list[int]]:
+    kept: list[int] = []
+    run_lengths: list[int] = []
+    reference: np.ndarray | None = None
+
+    for index in range(len(frames)):
+        probe = _probe(frames[index])
+        # Compare against the last kept frame so slow drifts still produce a new frame eventually.
+        if reference is not None and float(np.mean(np.abs(probe - reference))) <= threshold:
+            run_lengths[-1] += 1
+            continue
+        kept.append(index)
+        run_lengths.append(1)
+        reference = probe
+
+    return kept, run_lengths
@@ -0,0 +1,177 @@
+import os
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from .quantizer import PaletteQuantizer
+
+VIDEO_FOURCC = {
+    "webm": "VP90",
+    "mp4": "mp4v",
+    "mpeg": "PIM1",
+}
+ANIMATED_IMAGE_FORMATS = ("gif", "webp", "webp-lossless", "apng")
+
+
+def encode_workers() -> int:
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def _frame_durations(fps: int, frame_repeats: Sequence[int] | None) -> int | list[int]:
+    duration_ms = max(1, int(round(1000 / fps)))
+    return [duration_ms * count for count in frame_repeats] if frame_repeats else duration_ms
+
+
+def palette_colors_for_quality(quality_percent: int) -> int:
+    return max(16, min(256, int(round(16 + (quality_percent / 100.0) * 240))))
+
+
+def _in_order(images: list[Image.Image], order: Sequence[int] | None) -> list[Image.Image]:
+    # Repeated indices share one converted image, so frames played twice are only quantized once.
+    return images if order is None else [images[index] for index in order]
+
+
+def quantize_gif_frames(
+    frames: Sequence[np.ndarray],
+    quality_percent: int,
+    dither: bool = False,
+    order: Sequence[int] | None = None,
+) -> list[Image.Image]:
+    quantizer = PaletteQuantizer.from_frames(frames, palette_colors_for_quality(quality_percent))
+    palette = quantizer.palette_bytes()
+
+    def convert(frame: np.ndarray) -> Image.Image:
+        image = Image.fromarray(quantizer.map(frame, dither=dither))
+        image.putpalette(palette)
+        return image
+
+    with ThreadPoolExecutor(max_workers=encode_workers()) as executor:
+        return _in_order(list(executor.map(convert, frames)), order)
+
+
+def _rgb_images(frames: Sequence[np.ndarray], order: Sequence[int] | None = None) -> list[Image.Image]:
+    with ThreadPoolExecutor(max_workers=encode_workers()) as executor:
+        images = list(executor.map(lambda frame: Image.fromarray(np.ascontiguousarray(frame)), frames))
+    return _in_order(images, order)
+
+
+def write_gif(
+    frames: Sequence[np.ndarray],
+    save_path: str | BinaryIO,
+    fps: int,
+    quality_percent: int,
+    dither: bool = False,
+    frame_repeats: Sequence[int] | None = None,
+    order: Sequence[int] | None = None,
+) -> None:
+    durations = _frame_durations(fps, frame_repeats)
+    gif_frames = quantize_gif_frames(frames, quality_percent, dither=dither, order=order)
+    first, rest = gif_frames[0], gif_frames[1:]
+    first.save(
+        save_path,
+        format="GIF",
+        save_all=True,
+        append_images=rest,
+        duration=durations,
+        loop=0,
+        optimize=quality_percent >= 70,
+        disposal=2,
+    )
+
+
+def write_webp(
+    frames: Sequence[np.ndarray],
+    save_path: str | BinaryIO,
+    fps: int,
+    quality_percent: int,
+    lossless: bool = False,
+    frame_repeats: Sequence[int] | None = None,
+    order: Sequence[int] | None = None,
+) -> None:
+    images = _rgb_images(frames, order)
+    first, rest = images[0], images[1:]
+    # For lossless WebP, Pillow treats quality as compression effort rather than fidelity.
+    first.save(
+        save_path,
+        format="WEBP",
+        save_all=True,
+        append_images=rest,
+        duration=_frame_durations(fps, frame_repeats),
+        loop=0,
+        lossless=lossless,
+        quality=quality_percent,
+        method=4,
+    )
+
+
+def write_apng(
+    frames: Sequence[np.ndarray],
+    save_path: str | BinaryIO,
+    fps: int,
+    quality_percent: int,
+    frame_repeats: Sequence[int] | None = None,
+    order: Sequence[int] | None = None,
+) -> None:
+    images = _rgb_images(frames, order)
+    first, rest = images[0], images[1:]
+    first.save(
+        save_path,
+        format="PNG",
+        save_all=True,
+        append_images=rest,
+        duration=_frame_durations(fps, frame_repeats),
+        loop=0,
+        compress_level=max(1, min(9, int(round(quality_percent / 100.0 * 9)))),
+    )
+
+
+def write_video(
+    frames: Sequence[np.ndarray],
+    save_path: str,
+    output_format: str,
+    fps: int,
+    order: Sequence[int] | None = None,
+) -> None:
+    height, width, _ = frames[0].shape
+    fourcc = cv2.VideoWriter_fourcc(*VIDEO_FOURCC.get(output_format, "mp4v"))
+    writer = cv2.VideoWriter(save_path, fourcc, float(fps), (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Failed to initialize writer for format: {output_format}")
+
+    try:
+        for index in range(len(frames)) if order is None else order:
+            writer.write(cv2.cvtColor(frames[index], cv2.COLOR_RGB2BGR))
+    finally:
+        writer.release()
+
+
+def write_export(
+    frames: Sequence[np.ndarray],
+    save_path: str,
+    output_format: str,
+    fps: int,
+    quality_percent: int,
+    dither: bool = False,
+    frame_repeats: Sequence[int] | None = None,
+    order: Sequence[int] | None = None,
+) -> None:
+    if output_format == "gif":
+        write_gif(frames, save_path, fps, quality_percent, dither=dither, frame_repeats=frame_repeats, order=order)
+    elif output_format in ("webp", "webp-lossless"):
+        write_webp(
+            frames,
+            save_path,
+            fps,
+            quality_percent,
+            lossless=output_format == "webp-lossless",
+            frame_repeats=frame_repeats,
+            order=order,
+        )
+    elif output_format == "apng":
+        write_apng(frames, save_path, fps, quality_percent, frame_repeats=frame_repeats, order=order)
+    else:
+        write_video(frames, save_path, output_format, fps, order=order)
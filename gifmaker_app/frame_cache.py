@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .frame_spool import FrameStore
+
+MEMORY_BUDGET_BYTES = 512 * 1024 * 1024
+DISK_BUDGET_BYTES = 4 * 1024 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class PreparedFramesKey:
+    source: str
+    source_mtime_ns: int
+    source_size: int
+    frames_digest: str
+    crop_rect: tuple[int, int, int, int] | None
+    target_width: int
+    crossfade_frames: int = 0
+
+    @classmethod
+    def for_export(
+        cls,
+        source_path: Path,
+        frame_numbers: Sequence[int],
+        crop_rect: tuple[int, int, int, int] | None,
+        target_width: int,
+        crossfade_frames: int = 0,
+    ) -> PreparedFramesKey:
+        stat = source_path.stat()
+        digest = hashlib.sha1(",".join(str(number) for number in frame_numbers).encode("ascii")).hexdigest()
+        return cls(
+            str(source_path.resolve()),
+            stat.st_mtime_ns,
+            stat.st_size,
+            digest,
+            tuple(crop_rect) if crop_rect is not None else None,
+            target_width,
+            crossfade_frames,
+        )
+
+
+class PreparedFrameCache:
+    def __init__(
+        self,
+        memory_budget_bytes: int = MEMORY_BUDGET_BYTES,
+        disk_budget_bytes: int = DISK_BUDGET_BYTES,
+    ) -> None:
+        self.memory_budget_bytes = memory_budget_bytes
+        self.disk_budget_bytes = disk_budget_bytes
+        self._entries: OrderedDict[PreparedFramesKey, FrameStore] = OrderedDict()
+
+    def get(self, key: PreparedFramesKey) -> FrameStore | None:
+        store = self._entries.get(key)
+        if store is not None:
+            self._entries.move_to_end(key)
+        return store
+
+    def put(self, key: PreparedFramesKey, store: FrameStore) -> bool:
+        on_disk = store.on_disk
+        budget = self.disk_budget_bytes if on_disk else self.memory_budget_bytes
+        if store.nbytes > budget:
+            return False
+
+        previous = self._entries.pop(key, None)
+        if previous is not None and previous is not store:
+            previous.close()
+        self._entries[key] = store
+        self._evict(on_disk, budget)
+        return True
+
+    def _evict(self, on_disk: bool, budget: int) -> None:
+        def used() -> int:
+            return sum(s.nbytes for s in self._entries.values() if s.on_disk == on_disk)
+
+        while used() > budget:
+            oldest = next(k for k, s in self._entries.items() if s.on_disk == on_disk)
+            self._entries.pop(oldest).close()
+
+    def __contains__(self, key: PreparedFramesKey) -> bool:
+        return key in self._entries
+
+    def clear(self) -> None:
+        for store in self._entries.values():
+            store.close()
+        self._entries.clear()
@@ -0,0 +1,39 @@
+import cv2
+import numpy as np
+
+
+def crop_frame(rgb: np.ndarray, crop_rect: tuple[int, int, int, int] | None) -> np.ndarray:
+    if crop_rect is None:
+        return rgb
+
+    x, y, width, height = crop_rect
+    x = max(0, min(x, rgb.shape[1] - 1))
+    y = max(0, min(y, rgb.shape[0] - 1))
+    width = max(1, min(width, rgb.shape[1] - x))
+    height = max(1, min(height, rgb.shape[0] - y))
+    return rgb[y : y + height, x : x + width]
+
+
+def prepare_frame(
+    rgb: np.ndarray,
+    crop_rect: tuple[int, int, int, int] | None,
+    target_width: int,
+) -> np.ndarray:
+    rgb = crop_frame(rgb, crop_rect)
+    src_h, src_w, _ = rgb.shape
+    target_height = max(1, int(src_h * (target_width / src_w)))
+    return cv2.resize(rgb, (target_width, target_height), interpolation=cv2.INTER_AREA)
+
+
+def build_comparison_rgb(first_rgb: np.ndarray, last_rgb: np.ndarray) -> np.ndarray:
+    tint_strength = 0.45
+    overlay_alpha = 0.5
+
+    blue_tint = np.array([80.0, 120.0, 255.0], dtype=np.float32)
+    red_tint = np.array([255.0, 100.0, 100.0], dtype=np.float32)
+
+    first_tinted = first_rgb.astype(np.float32) * (1.0 - tint_strength) + blue_tint * tint_strength
+    last_tinted = last_rgb.astype(np.float32) * (1.0 - tint_strength) + red_tint * tint_strength
+
+    blended = first_tinted * (1.0 - overlay_alpha) + last_tinted * overlay_alpha
+    return np.clip(blended, 0, 255).astype(np.uint8)
@@ -0,0 +1,176 @@
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+import numpy as np
+
+from .paths import cache_dir
+
+SPOOL_THRESHOLD_BYTES = 512 * 1024 * 1024
+
+
+def default_spool_dir() -> Path:
+    return cache_dir("spool")
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def remove_stale_spools(directory: Path | None = None) -> int:
+    spool_dir = directory or default_spool_dir()
+    removed = 0
+    for path in spool_dir.glob("frames-*.spool"):
+        owner = path.name.split("-")[1]
+        if owner.isdigit() and _process_alive(int(owner)):
+            continue
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+class FrameStore(ABC):
+    on_disk = False
+
+    def __init__(self, capacity: int, shape: tuple[int, ...], dtype: np.dtype = np.uint8) -> None:
+        self.capacity = max(0, capacity)
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self._count = 0
+
+    @property
+    def frame_bytes(self) -> int:
+        return int(np.prod(self.shape)) * self.dtype.itemsize
+
+    @property
+    def nbytes(self) -> int:
+        return self._count * self.frame_bytes
+
+    @abstractmethod
+    def _buffer(self) -> np.ndarray:
+        ...
+
+    def append(self, frame: np.ndarray) -> None:
+        if self._count >= self.capacity:
+            raise IndexError("Frame store is full.")
+        if frame.shape != self.shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match store shape {self.shape}.")
+        self._buffer()[self._count] = frame
+        self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._buffer()[index]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        buffer = self._buffer()
+        for index in range(self._count):
+            yield buffer[index]
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "FrameStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class MemoryFrameStore(FrameStore):
+    def __init__(self, capacity: int, shape: tuple[int, ...], dtype: np.dtype = np.uint8) -> None:
+        super().__init__(capacity, shape, dtype)
+        self._frames = np.empty((self.capacity, *self.shape), dtype=self.dtype)
+
+    def _buffer(self) -> np.ndarray:
+        return self._frames
+
+    def close(self) -> None:
+        self._frames = np.empty((0, *self.shape), dtype=self.dtype)
+        self._count = 0
+
+
+class FrameSpool(FrameStore):
+    on_disk = True
+
+    def __init__(
+        self,
+        capacity: int,
+        shape: tuple[int, ...],
+        dtype: np.dtype = np.uint8,
+        directory: Path | None = None,
+    ) -> None:
+        super().__init__(capacity, shape, dtype)
+        spool_dir = directory or default_spool_dir()
+        spool_dir.mkdir(parents=True, exist_ok=True)
+        # The owner's pid in the name lets a later process tell leftovers from a crash apart from live spools.
+        handle, path = tempfile.mkstemp(prefix=f"frames-{os.getpid()}-", suffix=".spool", dir=spool_dir)
+        os.close(handle)
+        self.path = Path(path)
+        self._map: np.memmap | None = np.memmap(
+            self.path,
+            dtype=self.dtype,
+            mode="w+",
+            shape=(max(1, self.capacity), *self.shape),
+        )
+
+    def _buffer(self) -> np.ndarray:
+        if self._map is None:
+            raise RuntimeError("Frame spool is closed.")
+        return self._map
+
+    def close(self) -> None:
+        self._map = None
+        self._count = 0
+        self.path.unlink(missing_ok=True)
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class FrameView:
+    def __init__(self, frames: Sequence[np.ndarray], indices: Sequence[int]) -> None:
+        self.frames = frames
+        self.indices = list(indices)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        return self.frames[self.indices[index]]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for index in self.indices:
+            yield self.frames[index]
+
+
+def create_frame_store(
+    capacity: int,
+    shape: tuple[int, ...],
+    dtype: np.dtype = np.uint8,
+    threshold_bytes: int = SPOOL_THRESHOLD_BYTES,
+) -> FrameStore:
+    estimated_bytes = capacity * int(np.prod(shape)) * np.dtype(dtype).itemsize
+    if estimated_bytes > threshold_bytes:
+        return FrameSpool(capacity, shape, dtype)
+    return MemoryFrameStore(capacity, shape, dtype)
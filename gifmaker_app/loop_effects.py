@@ -0,0 +1,50 @@
+from collections import deque
+from collections.abc import Sequence
+
+import cv2
+import numpy as np
+
+
+def boomerang_length(frame_count: int) -> int:
+    return max(frame_count, 2 * frame_count - 2)
+
+
+def boomerang_order(
+    frame_count: int,
+    frame_repeats: Sequence[int] | None = None,
+) -> tuple[list[int], list[int] | None]:
+    # The first and last frames are not repeated at the turns, so the loop does not stall on them.
+    backward = list(range(frame_count - 2, 0, -1))
+    order = list(range(frame_count)) + backward
+    repeats = None if frame_repeats is None else list(frame_repeats) + [frame_repeats[i] for i in backward]
+    return order, repeats
+
+
+class CrossfadeLoop:
+    def __init__(self, total_frames: int, fade_frames: int) -> None:
+        self.total_frames = total_frames
+        # Keep at least one untouched frame between the buffered head and the blended tail.
+        self.fade_frames = max(0, min(fade_frames, (total_frames - 1) // 2))
+        self.output_count = total_frames - self.fade_frames
+        self._head: deque[np.ndarray] = deque(maxlen=max(1, self.fade_frames))
+        self._seen = 0
+
+    def push(self, frame: np.ndarray) -> np.ndarray | None:
+        index = self._seen
+        self._seen += 1
+        if index < self.fade_frames:
+            self._head.append(frame)
+            return None
+
+        tail_index = index - (self.total_frames - self.fade_frames)
+        if tail_index < 0 or not self._head:
+            return frame
+        # Fade from the tail into the head, so the loop wraps onto the first frame after the buffered ones.
+        weight = (tail_index + 1) / (self.fade_frames + 1)
+        return cv2.addWeighted(frame, 1.0 - weight, self._head.popleft(), weight, 0.0)
+
+    def finish(self) -> list[np.ndarray]:
+        # If the source ended early, the unblended head frames still continue the loop where the output stops.
+        remaining = list(self._head)
+        self._head.clear()
+        return remaining
@@ -0,0 +1,86 @@
+import queue
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+
+from .frame_ops import prepare_frame
+from .video_reader import VideoReader
+
+RING_BUFFER_FRAMES = 24
+
+
+class LoopPrefetcher:
+    def __init__(
+        self,
+        video_path: Path,
+        frame_numbers: list[int],
+        crop_rect: tuple[int, int, int, int] | None,
+        target_width: int,
+        capacity: int = RING_BUFFER_FRAMES,
+        timestamps: Sequence[float] | None = None,
+    ) -> None:
+        self.video_path = video_path
+        self.timestamps = timestamps
+        self.frame_numbers = list(frame_numbers)
+        self.crop_rect = crop_rect
+        self.target_width = target_width
+        self.error: str | None = None
+        self._buffer: queue.Queue[np.ndarray] = queue.Queue(maxsize=max(1, capacity))
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None or not self.frame_numbers:
+            return
+        self._thread = threading.Thread(target=self._run, name="loop-prefetch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            while self._thread.is_alive():
+                self._drain()
+                self._thread.join(timeout=0.05)
+            self._thread = None
+        self._drain()
+
+    def next_frame(self) -> np.ndarray | None:
+        try:
+            return self._buffer.get_nowait()
+        except queue.Empty:
+            return None
+
+    def buffered(self) -> int:
+        return self._buffer.qsize()
+
+    def _drain(self) -> None:
+        try:
+            while True:
+                self._buffer.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _put(self, frame: np.ndarray) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._buffer.put(frame, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self) -> None:
+        reader = VideoReader()
+        try:
+            reader.open(str(self.video_path), self.timestamps)
+            while not self._stop.is_set():
+                for _, rgb in reader.read_frames_rgb(self.frame_numbers):
+                    frame = prepare_frame(rgb, self.crop_rect, self.target_width)
+                    if not self._put(np.ascontiguousarray(frame)):
+                        return
+        except Exception as exc:
+            self.error = str(exc)
+        finally:
+            reader.close()
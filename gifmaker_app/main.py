@@ -1,17 +1,144 @@
+from __future__ import annotations
+
+import argparse
+import os
 import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+# Qt is imported only on the GUI path, so `serve` runs on boxes without display libraries.
+if TYPE_CHECKING:
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="gifmaker")
+    parser.add_argument("video", nargs="?", help="Video file to open")
+    parser.add_argument(
+        "--single-instance",
+        action="store_true",
+        help="Hand the video to an already running instance, or become that instance",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="With --single-instance, stay resident this long after the last window closes",
+    )
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
+class _WindowManager:
+    def __init__(self, app: QApplication, idle_timeout: float) -> None:
+        from PySide6.QtCore import QTimer
+
+        self.app = app
+        self.windows: list = []
+        # Windows with a load queued but not yet started; they still look empty until it runs.
+        self.pending_loads: dict = {}
+        self.idle_timer: QTimer | None = None
+        if idle_timeout > 0:
+            app.setQuitOnLastWindowClosed(False)
+            self.idle_timer = QTimer()
+            self.idle_timer.setSingleShot(True)
+            self.idle_timer.setInterval(int(idle_timeout * 1000))
+            self.idle_timer.timeout.connect(app.quit)
+
+    def new_window(self):
+        from PySide6.QtCore import Qt
+
+        from .main_window import GifMakerWindow
+
+        window = GifMakerWindow()
+        window.setAttribute(Qt.WA_DeleteOnClose, True)
+        window.destroyed.connect(lambda *_args, w=window: self._on_window_destroyed(w))
+        self.windows.append(window)
+        if self.idle_timer is not None:
+            self.idle_timer.stop()
+        window.show()
+        return window
+
+    def open_file(self, file_path: str) -> None:
+        from PySide6.QtCore import QTimer
+
+        window = next((w for w in self.windows if w.reader.info is None and w not in self.pending_loads), None)
+        if window is None:
+            window = self.new_window()
+        self.pending_loads[window] = file_path
+        window.open_button.hide()
+        window.raise_()
+        window.activateWindow()
+        QTimer.singleShot(0, lambda: self._load_pending(window))
+
+    def _load_pending(self, window) -> None:
+        file_path = self.pending_loads.pop(window, None)
+        if file_path is not None and window in self.windows:
+            window.load_video(file_path)
 
-from PySide6.QtWidgets import QApplication
+    def _on_window_destroyed(self, window) -> None:
+        if window in self.windows:
+            self.windows.remove(window)
+        self.pending_loads.pop(window, None)
+        if not self.windows and self.idle_timer is not None:
+            self.idle_timer.start()
 
-from .main_window import GifMakerWindow
+
+def _remove_stale_spools() -> None:
+    from .frame_spool import remove_stale_spools
+
+    remove_stale_spools()
 
 
 def main() -> int:
+    if sys.argv[1:2] == ["serve"]:
+        from .render_server import main as serve_main
+
+        return serve_main(sys.argv[2:])
+
+    args = _parse_args(sys.argv[1:])
+    video_path = str(Path(args.video).resolve()) if args.video else None
+
+    if args.single_instance and video_path:
+        from .single_instance import forward_to_running_instance
+
+        if forward_to_running_instance(video_path):
+            return 0
+
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+
     app = QApplication(sys.argv)
-    window = GifMakerWindow()
-    window.show()
+    manager = _WindowManager(app, args.idle_timeout if args.single_instance else 0.0)
 
-    if len(sys.argv) > 1:
-        window.open_button.hide()
-        window.load_video(sys.argv[1])
+    server = None
+    if args.single_instance:
+        from .single_instance import SingleInstanceServer, forward_to_running_instance
+
+        server = SingleInstanceServer()
+        if server.listen():
+            server.fileRequested.connect(manager.open_file)
+        else:
+            server = None
+            # Another launch won the race to listen; hand the file over to it instead of opening here.
+            if video_path and forward_to_running_instance(video_path):
+                return 0
+
+    manager.new_window()
+    if video_path:
+        # Defer the first decode so the window paints before cv2/NumPy are imported.
+        manager.open_file(video_path)
+
+    # Spools left behind by a crashed run are never reopened; clear them once the window is up.
+    QTimer.singleShot(0, _remove_stale_spools)
+
+    if os.environ.get("GIFMAKER_EXIT_AFTER_SHOW"):
+        QTimer.singleShot(0, app.quit)
 
-    return app.exec()
+    try:
+        return app.exec()
+    finally:
+        if server is not None:
+            server.close()
@@ -1,7 +1,8 @@
-import cv2
-import numpy as np
-from PIL import Image
-from PySide6.QtCore import Qt
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QImage, QPixmap
 from PySide6.QtWidgets import (
     QApplication,
@@ -22,9 +23,18 @@ from PySide6.QtWidgets import (
 )
 
 from .crop_preview import CropPreviewWidget
+from .frame_cache import PreparedFrameCache
+from .recompute import ComparisonWorker, RecomputeScheduler
 from .timeline_widget import TimelineWidget
 from .video_reader import VideoReader
 
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .loop_player import LoopPrefetcher
+    from .scrub_track import ScrubTrack
+    from .thumbnail_cache import ThumbnailCache
+
 
 class GifMakerWindow(QMainWindow):
     def __init__(self) -> None:
@@ -40,17 +50,18 @@ class GifMakerWindow(QMainWindow):
             QPushButton {
                 min-height: 28px;
             }
-            QPushButton#openButton {
+            QPushButton#openButton, QPushButton#playButton {
                 background-color: #2b2b2b;
                 color: #e5e5e5;
                 border: 1px solid #4a4a4a;
                 padding: 5px 12px;
                 font-weight: 500;
             }
-            QPushButton#openButton:hover {
+            QPushButton#openButton:hover, QPushButton#playButton:hover {
                 background-color: #363636;
             }
-            QPushButton#openButton:pressed {
+            QPushButton#openButton:pressed, QPushButton#playButton:pressed,
+            QPushButton#playButton:checked {
                 background-color: #202020;
             }
             QPushButton#exportButton {
@@ -79,6 +90,28 @@ class GifMakerWindow(QMainWindow):
         self.start_frame = 0
         self.end_frame = 0
 
+        self._loop_prefetcher: LoopPrefetcher | None = None
+        self._loop_started = False
+        self._loop_dropped_frames = 0
+        self._loop_timer = QTimer(self)
+        self._loop_timer.setTimerType(Qt.PreciseTimer)
+        self._loop_timer.timeout.connect(self._on_loop_tick)
+
+        self._scrub_track: ScrubTrack | None = None
+        self._thumbnail_cache: ThumbnailCache | None = None
+        self._index_cached = False
+        self._full_frame_timer = QTimer(self)
+        self._full_frame_timer.setSingleShot(True)
+        self._full_frame_timer.setInterval(120)
+        self._full_frame_timer.timeout.connect(lambda: self._show_frame(self.current_frame))
+
+        self._size_model_scale: dict[str, float] = {}
+        self._frame_cache = PreparedFrameCache()
+        self._comparison_pixmap: QPixmap | None = None
+        self._comparison_worker = ComparisonWorker(self)
+        self._comparison_worker.resultReady.connect(self._on_comparison_ready)
+        self._scheduler = RecomputeScheduler(self._recompute_derived_views, parent=self)
+
         root = QWidget()
         self.setCentralWidget(root)
         layout = QVBoxLayout(root)
@@ -92,13 +125,25 @@ class GifMakerWindow(QMainWindow):
         self.export_button.setObjectName("exportButton")
         self.export_button.setEnabled(False)
         self.format_combo = QComboBox()
-        self.format_combo.addItems(["gif", "webm", "mp4", "mpeg"])
+        self.format_combo.addItems(["gif", "webp", "webp-lossless", "apng", "webm", "mp4", "mpeg"])
         self.format_combo.setCurrentText("gif")
         self.format_combo.setFixedWidth(110)
         self.compare_toggle = QCheckBox("Enable first/last comparison")
         self.compare_toggle.setEnabled(False)
+        self.auto_crop_button = QPushButton("Auto crop")
+        self.auto_crop_button.setToolTip("Crop away black bars and static borders across the selected range")
+        self.auto_crop_button.setEnabled(False)
+        self.play_button = QPushButton("Play loop")
+        self.play_button.setObjectName("playButton")
+        self.play_button.setCheckable(True)
+        self.play_button.setEnabled(False)
+        self.playback_label = QLabel("")
+        self.playback_label.setStyleSheet("color: #cfcfcf;")
         top_row.addWidget(self.open_button)
+        top_row.addWidget(self.play_button)
+        top_row.addWidget(self.playback_label)
         top_row.addStretch(1)
+        top_row.addWidget(self.auto_crop_button)
         top_row.addWidget(self.compare_toggle)
         layout.addLayout(top_row)
 
@@ -133,6 +178,28 @@ class GifMakerWindow(QMainWindow):
         self.quality_spin.setRange(1, 100)
         self.quality_spin.setValue(80)
         self.quality_spin.setFixedWidth(86)
+        self.dither_toggle = QCheckBox("Dither")
+        self.dither_toggle.setToolTip("Ordered (Bayer) dithering for GIF export")
+        self.dedupe_toggle = QCheckBox("Drop duplicates")
+        self.dedupe_toggle.setToolTip("Merge near-identical consecutive frames into longer frames (GIF, WebP, APNG)")
+        self.boomerang_toggle = QCheckBox("Boomerang")
+        self.boomerang_toggle.setToolTip("Play the range forward, then backward, for a seamless loop")
+        self.crossfade_toggle = QCheckBox("Crossfade")
+        self.crossfade_toggle.setToolTip("Blend the last frames of the range into the first ones to hide the loop seam")
+        self.crossfade_spin = QSpinBox()
+        self.crossfade_spin.setRange(1, 60)
+        self.crossfade_spin.setValue(6)
+        self.crossfade_spin.setSuffix(" fr")
+        self.crossfade_spin.setFixedWidth(70)
+        self.crossfade_spin.setEnabled(False)
+        self.max_size_toggle = QCheckBox("Max size")
+        self.max_size_toggle.setToolTip("Search width, fps and colours for the best GIF under the size limit")
+        self.max_size_spin = QSpinBox()
+        self.max_size_spin.setRange(50, 1_000_000)
+        self.max_size_spin.setValue(8000)
+        self.max_size_spin.setSuffix(" KB")
+        self.max_size_spin.setFixedWidth(110)
+        self.max_size_spin.setEnabled(False)
 
         footer = QFrame()
         footer.setFrameShape(QFrame.StyledPanel)
@@ -150,6 +217,15 @@ class GifMakerWindow(QMainWindow):
         footer_layout.addSpacing(12)
         footer_layout.addWidget(QLabel("Quality %"))
         footer_layout.addWidget(self.quality_spin)
+        footer_layout.addSpacing(12)
+        footer_layout.addWidget(self.dither_toggle)
+        footer_layout.addWidget(self.dedupe_toggle)
+        footer_layout.addWidget(self.boomerang_toggle)
+        footer_layout.addWidget(self.crossfade_toggle)
+        footer_layout.addWidget(self.crossfade_spin)
+        footer_layout.addSpacing(12)
+        footer_layout.addWidget(self.max_size_toggle)
+        footer_layout.addWidget(self.max_size_spin)
 
         footer_layout.addStretch(1)
         footer_layout.addWidget(self.format_combo)
@@ -163,6 +239,8 @@ class GifMakerWindow(QMainWindow):
         self.open_button.clicked.connect(self.open_video)
         self.export_button.clicked.connect(self.export_media)
         self.compare_toggle.toggled.connect(self.on_compare_toggled)
+        self.auto_crop_button.clicked.connect(self.auto_crop)
+        self.play_button.toggled.connect(self.on_play_toggled)
         self.timeline.currentFrameChanged.connect(self.on_timeline_current_changed)
         self.timeline.rangeChanged.connect(self.on_timeline_range_changed)
         self.preview.cropChanged.connect(self.on_crop_changed)
@@ -170,8 +248,18 @@ class GifMakerWindow(QMainWindow):
         self.gif_fps_spin.valueChanged.connect(self.on_export_settings_changed)
         self.quality_spin.valueChanged.connect(self.on_export_settings_changed)
         self.format_combo.currentTextChanged.connect(self.on_export_format_changed)
+        self.max_size_toggle.toggled.connect(self.max_size_spin.setEnabled)
+        self.boomerang_toggle.toggled.connect(lambda _checked: self._scheduler.mark_dirty(RecomputeScheduler.SETTINGS))
+        self.crossfade_toggle.toggled.connect(self.crossfade_spin.setEnabled)
+        self.crossfade_toggle.toggled.connect(lambda _checked: self._scheduler.mark_dirty(RecomputeScheduler.SETTINGS))
+        self.crossfade_spin.valueChanged.connect(self.on_export_settings_changed)
 
     def closeEvent(self, event) -> None:
+        self._stop_loop_playback()
+        self._stop_scrub_track()
+        self._close_thumbnail_cache()
+        self._comparison_worker.close()
+        self._frame_cache.clear()
         self.reader.close()
         super().closeEvent(event)
 
@@ -191,53 +279,48 @@ class GifMakerWindow(QMainWindow):
         if not file_path:
             return
 
+        self._stop_loop_playback()
+        self._stop_scrub_track()
+        self._close_thumbnail_cache()
         try:
             info = self.reader.open(file_path)
         except Exception as exc:
             QMessageBox.critical(self, "Open failed", str(exc))
             return
 
+        from .timestamp_index import apply_timestamp_index, load_timestamp_index
+
+        # A cached index gives exact frame times now; otherwise the scrub track pass records one.
+        cached_index = load_timestamp_index(info.path)
+        apply_timestamp_index(info, cached_index)
+        self._index_cached = cached_index is not None
+
         self.current_frame = 0
         self.start_frame = 0
         self.end_frame = info.frame_count - 1
 
         self.export_button.setEnabled(True)
         self.compare_toggle.setEnabled(True)
+        self.auto_crop_button.setEnabled(True)
+        self.play_button.setEnabled(True)
 
         self.gif_width_spin.setValue(min(480, info.width))
 
         self.preview.set_source_size(info.width, info.height)
 
-        thumbnails = self._build_thumbnails(target_count=24, thumb_height=80)
         self.timeline.set_video_data(
             frame_count=info.frame_count,
             start_frame=self.start_frame,
             end_frame=self.end_frame,
             current_frame=self.current_frame,
-            thumbnails=thumbnails,
+            thumbnail_aspect=info.width / max(1, info.height),
         )
 
+        self._comparison_pixmap = None
         self._show_frame(self.current_frame)
-        self._update_comparison_view()
-        self._update_size_estimate()
-
-    def _build_thumbnails(self, target_count: int, thumb_height: int) -> list[QPixmap]:
-        info = self.reader.info
-        if info is None:
-            return []
-
-        count = max(2, min(target_count, info.frame_count))
-        indices = np.linspace(0, info.frame_count - 1, num=count, dtype=np.int32)
-        pixmaps: list[QPixmap] = []
-
-        for frame_idx in indices:
-            rgb = self.reader.read_frame_rgb(int(frame_idx))
-            h, w, _ = rgb.shape
-            thumb_width = max(1, int(w * (thumb_height / h)))
-            resized = cv2.resize(rgb, (thumb_width, thumb_height), interpolation=cv2.INTER_AREA)
-            pixmaps.append(self._rgb_to_pixmap(resized))
-
-        return pixmaps
+        self._start_scrub_track()
+        self._start_thumbnail_cache()
+        self._scheduler.mark_dirty(RecomputeScheduler.RANGE, RecomputeScheduler.CROP, RecomputeScheduler.SIZE)
 
     @staticmethod
     def _rgb_to_pixmap(rgb: np.ndarray) -> QPixmap:
@@ -254,82 +337,59 @@ class GifMakerWindow(QMainWindow):
             return
 
         self.preview.set_frame(rgb)
-        self._update_comparison_view()
-
-    def _build_comparison_rgb(self) -> np.ndarray | None:
-        if self.reader.info is None:
-            return None
-
-        try:
-            first_rgb = self._apply_crop(self.reader.read_frame_rgb(self.start_frame)).astype(np.float32)
-            last_rgb = self._apply_crop(self.reader.read_frame_rgb(self.end_frame)).astype(np.float32)
-        except Exception:
-            return None
-
-        tint_strength = 0.45
-        overlay_alpha = 0.5
-
-        blue_tint = np.array([80.0, 120.0, 255.0], dtype=np.float32)
-        red_tint = np.array([255.0, 100.0, 100.0], dtype=np.float32)
 
-        first_tinted = first_rgb * (1.0 - tint_strength) + blue_tint * tint_strength
-        last_tinted = last_rgb * (1.0 - tint_strength) + red_tint * tint_strength
-
-        blended = first_tinted * (1.0 - overlay_alpha) + last_tinted * overlay_alpha
-        return np.clip(blended, 0, 255).astype(np.uint8)
+    def _recompute_derived_views(self, dirty: set[str]) -> None:
+        if dirty & {RecomputeScheduler.CROP, RecomputeScheduler.RANGE}:
+            self._update_comparison_view()
+        self._update_size_estimate()
 
     def _update_comparison_view(self) -> None:
-        if not self.compare_toggle.isChecked() or self.reader.info is None:
+        info = self.reader.info
+        if not self.compare_toggle.isChecked() or info is None:
             self.comparison_preview.hide()
             return
 
-        comparison_rgb = self._build_comparison_rgb()
+        self._comparison_worker.request(
+            info.path, self.start_frame, self.end_frame, self._get_crop_rect(), info.timestamps
+        )
+        if self._comparison_pixmap is None:
+            self.comparison_preview.setText("Building comparison...")
+        self.comparison_preview.show()
+
+    def _on_comparison_ready(self, generation: int, comparison_rgb: np.ndarray | None) -> None:
+        if generation != self._comparison_worker.generation or not self.compare_toggle.isChecked():
+            return
+
         if comparison_rgb is None:
+            self._comparison_pixmap = None
             self.comparison_preview.setText("Comparison unavailable")
-            self.comparison_preview.show()
             return
 
-        pixmap = self._rgb_to_pixmap(comparison_rgb)
-        scaled = pixmap.scaled(
+        self._comparison_pixmap = self._rgb_to_pixmap(comparison_rgb)
+        self._show_comparison_pixmap()
+
+    def _show_comparison_pixmap(self) -> None:
+        if self._comparison_pixmap is None:
+            return
+        scaled = self._comparison_pixmap.scaled(
             self.comparison_preview.size(),
             Qt.KeepAspectRatio,
             Qt.SmoothTransformation,
         )
         self.comparison_preview.setPixmap(scaled)
-        self.comparison_preview.show()
 
     def resizeEvent(self, event) -> None:
         super().resizeEvent(event)
-        if self.reader.info is not None:
-            self._show_frame(self.current_frame)
-            self._update_comparison_view()
+        if self.comparison_preview.isVisible():
+            self._show_comparison_pixmap()
 
     def _get_crop_rect(self) -> tuple[int, int, int, int] | None:
         return self.preview.crop_rect()
 
     def _apply_crop(self, rgb: np.ndarray) -> np.ndarray:
-        crop_rect = self._get_crop_rect()
-        if crop_rect is None:
-            return rgb
+        from .frame_ops import crop_frame
 
-        x, y, width, height = crop_rect
-        x = max(0, min(x, rgb.shape[1] - 1))
-        y = max(0, min(y, rgb.shape[0] - 1))
-        width = max(1, min(width, rgb.shape[1] - x))
-        height = max(1, min(height, rgb.shape[0] - y))
-        return rgb[y : y + height, x : x + width]
-
-    @staticmethod
-    def _format_size(num_bytes: int) -> str:
-        size = float(max(0, num_bytes))
-        units = ["B", "KB", "MB", "GB"]
-        unit_index = 0
-        while size >= 1024.0 and unit_index < len(units) - 1:
-            size /= 1024.0
-            unit_index += 1
-        if unit_index == 0:
-            return f"{int(size)} {units[unit_index]}"
-        return f"{size:.1f} {units[unit_index]}"
+        return crop_frame(rgb, self._get_crop_rect())
 
     def _estimate_output_size_bytes(self) -> int | None:
         info = self.reader.info
@@ -337,10 +397,18 @@ class GifMakerWindow(QMainWindow):
             return None
 
         target_fps = max(1, self.gif_fps_spin.value())
-        step = max(1, int(round(info.fps / target_fps)))
-        frame_count = len(range(self.start_frame, self.end_frame + 1, step))
+        frame_count = len(info.sample_frames(self.start_frame, self.end_frame, target_fps))
         if frame_count <= 0:
             return None
+        crossfade_frames = self._crossfade_frames()
+        if crossfade_frames:
+            from .loop_effects import CrossfadeLoop
+
+            frame_count = CrossfadeLoop(frame_count, crossfade_frames).output_count
+        if self.boomerang_toggle.isChecked():
+            from .loop_effects import boomerang_length
+
+            frame_count = boomerang_length(frame_count)
 
         crop_rect = self._get_crop_rect()
         if crop_rect is None:
@@ -358,7 +426,17 @@ class GifMakerWindow(QMainWindow):
             raw_per_frame = out_w * out_h * 3
             compression_ratio = 3.0 + ((1.0 - quality) * 5.0)
             estimated = int(frame_count * (raw_per_frame / compression_ratio) + 24 * 1024)
-            return max(1, estimated)
+            return max(1, int(estimated * self._size_model_scale.get(output_format, 1.0)))
+
+        # Bytes per output pixel per frame for the Pillow-encoded animated image formats.
+        image_bytes_per_pixel = {
+            "webp": 0.03 + 0.12 * quality * quality,
+            "webp-lossless": 1.0 - 0.15 * quality,
+            "apng": 1.4 - 0.2 * quality,
+        }
+        if output_format in image_bytes_per_pixel:
+            estimated = int(frame_count * out_w * out_h * image_bytes_per_pixel[output_format] + 8 * 1024)
+            return max(1, int(estimated * self._size_model_scale.get(output_format, 1.0)))
 
         bpp_map = {
             "webm": 0.07,
@@ -369,43 +447,261 @@ class GifMakerWindow(QMainWindow):
         quality_scale = 0.6 + (quality * 0.8)
         bitrate = out_w * out_h * target_fps * base_bpp * quality_scale
         estimated = int((bitrate / 8.0) * duration_seconds + 64 * 1024)
-        return max(1, estimated)
+        return max(1, int(estimated * self._size_model_scale.get(output_format, 1.0)))
+
+    def _crossfade_frames(self) -> int:
+        return self.crossfade_spin.value() if self.crossfade_toggle.isChecked() else 0
+
+    def _learn_size_model(self, output_format: str, actual_bytes: int, estimated_bytes: int | None) -> None:
+        if not estimated_bytes or actual_bytes <= 0:
+            return
+        # Damped correction so a single unusual clip does not swing later estimates too far.
+        scale = self._size_model_scale.get(output_format, 1.0) * (actual_bytes / estimated_bytes) ** 0.5
+        self._size_model_scale[output_format] = max(0.1, min(10.0, scale))
+        self._update_size_estimate()
 
     def _update_size_estimate(self) -> None:
         estimated_bytes = self._estimate_output_size_bytes()
         if estimated_bytes is None:
             self.size_estimate_label.setText("Est size: —")
             return
-        self.size_estimate_label.setText(f"Est size: {self._format_size(estimated_bytes)}")
+        from .render_job import format_size
+
+        self.size_estimate_label.setText(f"Est size: {format_size(estimated_bytes)}")
+
+    def _start_scrub_track(self) -> None:
+        from .scrub_track import ScrubTrack
+
+        info = self.reader.info
+        if info is None:
+            return
+        self._scrub_track = ScrubTrack(info, record_timestamps=not self._index_cached, parent=self)
+        self._scrub_track.progressChanged.connect(self._on_scrub_progress)
+        self._scrub_track.timestampsReady.connect(self._on_timestamps_ready)
+        self.timeline.set_scrub_progress(0.0)
+        self.timeline.set_scrub_provider(self._scrub_pixmap)
+        self._scrub_track.start()
+
+    def _stop_scrub_track(self) -> None:
+        self._full_frame_timer.stop()
+        if self._scrub_track is None:
+            return
+        self.timeline.set_scrub_provider(None)
+        self._scrub_track.stop()
+        self._scrub_track.deleteLater()
+        self._scrub_track = None
+
+    def _scrub_pixmap(self, frame_index: int, exact: bool = False) -> QPixmap | None:
+        if self._scrub_track is None:
+            return None
+        rgb = self._scrub_track.frame(frame_index, exact=exact)
+        return None if rgb is None else self._rgb_to_pixmap(rgb)
+
+    def _start_thumbnail_cache(self) -> None:
+        from .thumbnail_cache import ThumbnailCache
+
+        info = self.reader.info
+        if info is None:
+            return
+        self._thumbnail_cache = ThumbnailCache(info.path, parent=self, timestamps=info.timestamps)
+        self._thumbnail_cache.thumbnailReady.connect(self.timeline.update)
+        self.timeline.thumbnailsNeeded.connect(self._on_thumbnails_needed)
+        self.timeline.set_thumbnail_provider(self._thumbnail_pixmap)
+
+    def _close_thumbnail_cache(self) -> None:
+        if self._thumbnail_cache is None:
+            return
+        self.timeline.thumbnailsNeeded.disconnect(self._on_thumbnails_needed)
+        self.timeline.set_thumbnail_provider(None)
+        self._thumbnail_cache.close()
+        self._thumbnail_cache.deleteLater()
+        self._thumbnail_cache = None
+
+    def _on_thumbnails_needed(self, frame_indices: list[int]) -> None:
+        if self._thumbnail_cache is None:
+            return
+        # Frames the scrub track already holds are cheaper to shrink than to decode again.
+        missing = [
+            index
+            for index in frame_indices
+            if self._scrub_track is None or self._scrub_track.frame(index, exact=True) is None
+        ]
+        self._thumbnail_cache.request(missing)
+
+    def _thumbnail_pixmap(self, frame_index: int) -> QPixmap | None:
+        if self._thumbnail_cache is None:
+            return None
+        pixmap = self._thumbnail_cache.get(frame_index)
+        if pixmap is None:
+            pixmap = self._scrub_pixmap(frame_index, exact=True)
+            if pixmap is not None:
+                self._thumbnail_cache.store(frame_index, pixmap)
+        return pixmap
+
+    def _on_scrub_progress(self, decoded: int, total: int) -> None:
+        finished = decoded >= total or (self._scrub_track is not None and self._scrub_track.error is not None)
+        # A decode error near the end usually means the container overstated its frame count.
+        self.timeline.set_scrub_progress(1.0 if finished else decoded / max(1, total))
+
+    def _on_timestamps_ready(self, timestamps: np.ndarray) -> None:
+        info = self.reader.info
+        if info is None or self.sender() is not self._scrub_track:
+            return
+
+        from .timestamp_index import apply_timestamp_index
+
+        # The timeline is already laid out for the reported frame count, so keep it.
+        if apply_timestamp_index(info, timestamps, trust_count=False):
+            if self._thumbnail_cache is not None:
+                self._thumbnail_cache.set_timestamps(info.timestamps)
+                self.timeline.update()
+            self._scheduler.mark_dirty(RecomputeScheduler.RANGE)
 
     def on_timeline_current_changed(self, frame: int) -> None:
         self.current_frame = frame
-        self._show_frame(frame)
+        scrub_rgb = self._scrub_track.frame(frame) if self._scrub_track is not None else None
+        if scrub_rgb is None:
+            self._show_frame(frame)
+            return
+
+        # Show the low-resolution frame now and decode full resolution once the playhead rests.
+        self.preview.set_frame(scrub_rgb)
+        self._full_frame_timer.start()
 
     def on_timeline_range_changed(self, start: int, end: int) -> None:
         self.start_frame = start
         self.end_frame = end
-        self._update_comparison_view()
-        self._update_size_estimate()
+        self._stop_loop_playback()
+        self._scheduler.mark_dirty(RecomputeScheduler.RANGE)
 
     def on_compare_toggled(self, enabled: bool) -> None:
         if not enabled:
+            self._comparison_pixmap = None
             self.comparison_preview.clear()
             self.comparison_preview.setText("Comparison disabled")
         self._update_comparison_view()
 
     def on_crop_changed(self, x: int, y: int, width: int, height: int) -> None:
         del x, y, width, height
-        self._update_comparison_view()
-        self._update_size_estimate()
+        self._stop_loop_playback()
+        self._scheduler.mark_dirty(RecomputeScheduler.CROP)
+
+    def auto_crop(self) -> None:
+        info = self.reader.info
+        if info is None:
+            return
+
+        import cv2
+        import numpy as np
+
+        from .auto_crop import AUTO_CROP_SAMPLES, detect_content_rect
+        from .parallel_decode import ParallelDecoder
+
+        count = max(2, min(AUTO_CROP_SAMPLES, self.end_frame - self.start_frame + 1))
+        frame_numbers = sorted({int(i) for i in np.linspace(self.start_frame, self.end_frame, num=count)})
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            with ParallelDecoder(
+                info.path,
+                frame_numbers,
+                transform=lambda rgb: cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY),
+                timestamps=info.timestamps,
+            ) as decoder:
+                samples = [gray for _, gray in decoder]
+            rect = detect_content_rect(samples)
+        except Exception as exc:
+            QMessageBox.warning(self, "Auto crop failed", str(exc))
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        if rect is None:
+            QMessageBox.information(self, "Auto crop", "No black or static borders found in the selected range.")
+            return
+        self.preview.set_crop_rect(*rect, emit_signal=True)
 
     def on_export_settings_changed(self, value: int) -> None:
         del value
-        self._update_size_estimate()
+        self._stop_loop_playback()
+        self._scheduler.mark_dirty(RecomputeScheduler.SETTINGS)
 
     def on_export_format_changed(self, value: str) -> None:
-        del value
-        self._update_size_estimate()
+        output_format = value.lower().strip()
+        is_gif = output_format == "gif"
+        self.dither_toggle.setEnabled(is_gif)
+        self.dedupe_toggle.setEnabled(output_format in ("gif", "webp", "webp-lossless", "apng"))
+        self.max_size_toggle.setEnabled(is_gif)
+        self.max_size_spin.setEnabled(is_gif and self.max_size_toggle.isChecked())
+        self._scheduler.mark_dirty(RecomputeScheduler.SETTINGS)
+
+    def on_play_toggled(self, checked: bool) -> None:
+        if checked:
+            self._start_loop_playback()
+        else:
+            self._stop_loop_playback()
+
+    def _start_loop_playback(self) -> None:
+        info = self.reader.info
+        if info is None:
+            self.play_button.setChecked(False)
+            return
+
+        from .loop_player import LoopPrefetcher
+
+        # Replace any running loop without touching the button, which is already checked.
+        self._teardown_loop_playback()
+        target_fps = self.gif_fps_spin.value()
+        frame_numbers = info.sample_frames(self.start_frame, self.end_frame, target_fps)
+        self._loop_prefetcher = LoopPrefetcher(
+            info.path,
+            frame_numbers,
+            self._get_crop_rect(),
+            self.gif_width_spin.value(),
+            timestamps=info.timestamps,
+        )
+        self._loop_prefetcher.start()
+        self._loop_started = False
+        self._loop_dropped_frames = 0
+        self.playback_label.setText("Buffering...")
+        self._loop_timer.start(max(1, int(round(1000 / target_fps))))
+
+    def _teardown_loop_playback(self) -> None:
+        self._loop_timer.stop()
+        if self._loop_prefetcher is not None:
+            self._loop_prefetcher.stop()
+            self._loop_prefetcher = None
+            self.preview.set_playback_frame(None)
+            self.playback_label.setText("")
+
+    def _stop_loop_playback(self) -> None:
+        self._teardown_loop_playback()
+        if self.play_button.isChecked():
+            self.play_button.blockSignals(True)
+            self.play_button.setChecked(False)
+            self.play_button.blockSignals(False)
+
+    def _on_loop_tick(self) -> None:
+        prefetcher = self._loop_prefetcher
+        if prefetcher is None:
+            return
+
+        frame = prefetcher.next_frame()
+        if frame is None:
+            if prefetcher.error is not None:
+                error = prefetcher.error
+                self._stop_loop_playback()
+                QMessageBox.warning(self, "Playback failed", error)
+                return
+            if self._loop_started:
+                self._loop_dropped_frames += 1
+        else:
+            self._loop_started = True
+            self.preview.set_playback_frame(frame)
+
+        if self._loop_started:
+            self.playback_label.setText(
+                f"{self.gif_fps_spin.value()} fps · dropped {self._loop_dropped_frames}"
+            )
 
     def export_media(self) -> None:
         info = self.reader.info
@@ -418,12 +714,16 @@ class GifMakerWindow(QMainWindow):
 
         output_format = self.format_combo.currentText().lower().strip()
         format_defaults = {
-            "gif": ("GIF files (*.gif)", ".gif"),
-            "webm": ("WebM files (*.webm)", ".webm"),
-            "mp4": ("MP4 files (*.mp4)", ".mp4"),
-            "mpeg": ("MPEG files (*.mpeg *.mpg)", ".mpeg"),
+            "gif": ("GIF files (*.gif)", (".gif",)),
+            "webp": ("WebP files (*.webp)", (".webp",)),
+            "webp-lossless": ("WebP files (*.webp)", (".webp",)),
+            "apng": ("Animated PNG files (*.png *.apng)", (".png", ".apng")),
+            "webm": ("WebM files (*.webm)", (".webm",)),
+            "mp4": ("MP4 files (*.mp4)", (".mp4",)),
+            "mpeg": ("MPEG files (*.mpeg *.mpg)", (".mpeg", ".mpg")),
         }
-        selected_filter, default_suffix = format_defaults.get(output_format, format_defaults["gif"])
+        selected_filter, suffixes = format_defaults.get(output_format, format_defaults["gif"])
+        default_suffix = suffixes[0]
 
         save_path, _ = QFileDialog.getSaveFileName(
             self,
@@ -434,88 +734,114 @@ class GifMakerWindow(QMainWindow):
         if not save_path:
             return
 
-        save_path_lower = save_path.lower()
-        if output_format == "mpeg":
-            if not (save_path_lower.endswith(".mpeg") or save_path_lower.endswith(".mpg")):
-                save_path = f"{save_path}.mpeg"
-        elif not save_path_lower.endswith(f".{output_format}"):
-            save_path = f"{save_path}.{output_format}"
+        if not save_path.lower().endswith(suffixes):
+            save_path = f"{save_path}{default_suffix}"
 
         target_fps = self.gif_fps_spin.value()
         target_width = self.gif_width_spin.value()
         quality_percent = self.quality_spin.value()
-        step = max(1, int(round(info.fps / target_fps)))
+        crop_rect = self._get_crop_rect()
 
-        frame_numbers = list(range(self.start_frame, self.end_frame + 1, step))
+        frame_numbers = info.sample_frames(self.start_frame, self.end_frame, target_fps)
         total = len(frame_numbers)
         if total == 0:
             QMessageBox.warning(self, "No frames", "Selected range produced no frames.")
             return
 
+        from .frame_cache import PreparedFramesKey
+        from .frame_ops import prepare_frame
+        from .frame_spool import create_frame_store
+        from .loop_effects import CrossfadeLoop, boomerang_length
+        from .parallel_decode import ParallelDecoder
+        from .render_job import format_size, render_prepared
+
         progress = QProgressDialog("Preparing frames...", "Cancel", 0, total, self)
         progress.setWindowModality(Qt.WindowModal)
         progress.setMinimumDuration(0)
 
-        frames: list[np.ndarray] = []
-        for index, frame_number in enumerate(frame_numbers, start=1):
-            if progress.wasCanceled():
-                return
-
+        summary_lines: list[str] = []
+        estimated_bytes = self._estimate_output_size_bytes()
+        crossfade = CrossfadeLoop(total, self._crossfade_frames())
+        cache_key = PreparedFramesKey.for_export(
+            info.path, frame_numbers, crop_rect, target_width, crossfade.fade_frames
+        )
+        prepared = self._frame_cache.get(cache_key)
+        cached = prepared is not None
+        decoder = ParallelDecoder(
+            info.path,
+            frame_numbers,
+            transform=lambda rgb: prepare_frame(rgb, crop_rect, target_width),
+            timestamps=info.timestamps,
+        )
+        try:
+            if cached:
+                progress.setValue(total)
+                summary_lines.append(f"Prepared frames: cache hit ({total} frames, no decoding)")
+            else:
+                try:
+                    for index, (_, resized) in enumerate(decoder, start=1):
+                        if progress.wasCanceled():
+                            return
+
+                        if prepared is None:
+                            prepared = create_frame_store(crossfade.output_count, resized.shape)
+                        # Only the first fade_frames frames are held back; the rest stream straight into the store.
+                        blended = crossfade.push(resized)
+                        if blended is not None:
+                            prepared.append(blended)
+
+                        progress.setValue(index)
+                        progress.setLabelText(
+                            f"Preparing frames... {index}/{total} ({decoder.worker_count} decoders)"
+                        )
+                        QApplication.processEvents()
+                except Exception as exc:
+                    QMessageBox.critical(self, "Export failed", str(exc))
+                    return
+                for leftover in crossfade.finish():
+                    prepared.append(leftover)
+                summary_lines.append(f"Prepared frames: cache miss ({total} frames decoded)")
+                if crossfade.fade_frames:
+                    summary_lines.append(f"Crossfaded {crossfade.fade_frames} frames across the loop seam")
+                cached = self._frame_cache.put(cache_key, prepared)
+
+            def show_status(text: str) -> None:
+                progress.setLabelText(text)
+                QApplication.processEvents()
+
+            max_size_bytes = None
+            if output_format == "gif" and self.max_size_toggle.isChecked():
+                max_size_bytes = self.max_size_spin.value() * 1024
+            boomerang = self.boomerang_toggle.isChecked()
+            # Read before the finally below, which closes stores the cache declined.
+            expected_frames = boomerang_length(len(prepared)) if boomerang else len(prepared)
             try:
-                rgb = self.reader.read_frame_rgb(frame_number)
+                result = render_prepared(
+                    prepared,
+                    save_path,
+                    output_format,
+                    target_fps,
+                    quality_percent,
+                    dither=self.dither_toggle.isChecked(),
+                    dedupe=self.dedupe_toggle.isChecked(),
+                    boomerang=boomerang,
+                    max_size_bytes=max_size_bytes,
+                    status=show_status,
+                )
             except Exception as exc:
                 QMessageBox.critical(self, "Export failed", str(exc))
                 return
-
-            rgb = self._apply_crop(rgb)
-
-            src_h, src_w, _ = rgb.shape
-            target_height = max(1, int(src_h * (target_width / src_w)))
-            resized = cv2.resize(rgb, (target_width, target_height), interpolation=cv2.INTER_AREA)
-            frames.append(resized)
-
-            progress.setValue(index)
-            progress.setLabelText(f"Preparing frames... {index}/{total}")
-            QApplication.processEvents()
-
-        try:
-            if output_format == "gif":
-                duration_ms = max(1, int(round(1000 / target_fps)))
-                palette_colors = max(16, min(256, int(round(16 + (quality_percent / 100.0) * 240))))
-                gif_frames = [
-                    Image.fromarray(frame).convert("P", palette=Image.Palette.ADAPTIVE, colors=palette_colors)
-                    for frame in frames
-                ]
-                first, rest = gif_frames[0], gif_frames[1:]
-                first.save(
-                    save_path,
-                    save_all=True,
-                    append_images=rest,
-                    duration=duration_ms,
-                    loop=0,
-                    optimize=quality_percent >= 70,
-                    disposal=2,
-                )
-            else:
-                fourcc_map = {
-                    "webm": "VP90",
-                    "mp4": "mp4v",
-                    "mpeg": "PIM1",
-                }
-                height, width, _ = frames[0].shape
-                fourcc = cv2.VideoWriter_fourcc(*fourcc_map.get(output_format, "mp4v"))
-                writer = cv2.VideoWriter(save_path, fourcc, float(target_fps), (width, height))
-                if not writer.isOpened():
-                    raise RuntimeError(f"Failed to initialize writer for format: {output_format}")
-
-                try:
-                    for frame in frames:
-                        writer.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
-                finally:
-                    writer.release()
-        except Exception as exc:
-            QMessageBox.critical(self, "Export failed", str(exc))
-            return
+        finally:
+            decoder.close()
+            if prepared is not None and not cached:
+                prepared.close()
 
         progress.close()
-        QMessageBox.information(self, "Done", f"Export saved:\n{save_path}")
+        # Resized, resampled or deduplicated output says nothing about the estimate for these settings.
+        if max_size_bytes is not None or result.frame_count != expected_frames:
+            estimated_bytes = None
+        self._learn_size_model(output_format, result.output_bytes, estimated_bytes)
+        summary_lines.extend(result.notes)
+        summary_lines.append(f"Size: {format_size(result.output_bytes)}")
+        summary_lines.append(f"Encode time: {result.encode_seconds:.2f} s")
+        QMessageBox.information(self, "Done", f"Export saved:\n{save_path}\n\n" + "\n".join(summary_lines))
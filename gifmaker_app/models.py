@@ -1,6 +1,11 @@
-from dataclasses import dataclass
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass, field
 from pathlib import Path
 
+# Slack when comparing timestamps, so rounding in container time bases does not skip a frame.
+TIME_EPSILON = 1e-6
+
 
 @dataclass
 class VideoInfo:
@@ -9,7 +14,41 @@ class VideoInfo:
     fps: float
     width: int
     height: int
+    # Presentation time in seconds of every frame, from a timestamp index; None means constant frame rate.
+    timestamps: Sequence[float] | None = field(default=None, repr=False)
 
     @property
     def duration_seconds(self) -> float:
+        if self.timestamps is not None:
+            return self.frame_time(self.frame_count - 1) - self.timestamps[0] + 1.0 / max(1.0, self.fps)
         return self.frame_count / self.fps if self.fps > 0 else 0.0
+
+    def frame_time(self, frame_index: int) -> float:
+        if self.timestamps is None:
+            return frame_index / self.fps
+        last = len(self.timestamps) - 1
+        if frame_index <= last:
+            return float(self.timestamps[frame_index])
+        return float(self.timestamps[last]) + (frame_index - last) / self.fps
+
+    def frames_at_times(self, seconds: Sequence[float], start_frame: int, end_frame: int) -> list[int]:
+        import numpy as np
+
+        # The frame on screen at a given time is the last one whose timestamp is not after it.
+        targets = np.asarray(seconds, dtype=np.float64)
+        if self.timestamps is None:
+            indices = np.floor(targets * self.fps + TIME_EPSILON).astype(np.int64)
+        else:
+            hi = min(end_frame + 1, len(self.timestamps))
+            window = np.asarray(self.timestamps[start_frame:hi], dtype=np.float64)
+            indices = start_frame + np.searchsorted(window, targets + TIME_EPSILON, side="right") - 1
+        return np.clip(indices, start_frame, end_frame).tolist()
+
+    def sample_frames(self, start_frame: int, end_frame: int, target_fps: float) -> list[int]:
+        import numpy as np
+
+        target_fps = max(1.0, target_fps)
+        start_time = self.frame_time(start_frame)
+        span = self.frame_time(end_frame) - start_time
+        count = int(math.floor(span * target_fps + TIME_EPSILON)) + 1
+        return self.frames_at_times(start_time + np.arange(count) / target_fps, start_frame, end_frame)
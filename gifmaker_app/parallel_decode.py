@@ -0,0 +1,155 @@
+import os
+import threading
+from collections import deque
+from collections.abc import Callable, Iterator, Sequence
+from pathlib import Path
+
+import numpy as np
+
+from .video_reader import VideoReader
+
+# Below this many source frames per chunk the extra capture open and seek cost more than they save.
+MIN_CHUNK_SPAN = 48
+# Decoded frames waiting for the consumer, across all chunks. Chunks ahead of the one being consumed
+# fill this while the consumer catches up; the current chunk may always buffer a few frames so it never stalls.
+DECODE_BUFFER_BYTES = 256 * 1024 * 1024
+CURRENT_CHUNK_FRAMES = 8
+
+_DONE = object()
+
+
+def default_worker_count() -> int:
+    return max(1, min(8, (os.cpu_count() or 1) - 1))
+
+
+def plan_chunks(frame_numbers: Sequence[int], max_workers: int | None = None) -> list[list[int]]:
+    if not frame_numbers:
+        return []
+
+    max_workers = max_workers or default_worker_count()
+    span = frame_numbers[-1] - frame_numbers[0] + 1
+    chunk_count = max(1, min(max_workers, span // MIN_CHUNK_SPAN, len(frame_numbers)))
+
+    # Split by source-frame span rather than output count so every capture decodes a similar amount.
+    first = frame_numbers[0]
+    boundaries = [first + (span * k) // chunk_count for k in range(1, chunk_count)]
+    chunks: list[list[int]] = [[] for _ in range(chunk_count)]
+    chunk_index = 0
+    for frame_number in frame_numbers:
+        while chunk_index < len(boundaries) and frame_number >= boundaries[chunk_index]:
+            chunk_index += 1
+        chunks[chunk_index].append(frame_number)
+    return [chunk for chunk in chunks if chunk]
+
+
+class ParallelDecoder:
+    def __init__(
+        self,
+        video_path: Path,
+        frame_numbers: Sequence[int],
+        transform: Callable[[np.ndarray], np.ndarray] | None = None,
+        max_workers: int | None = None,
+        buffer_bytes: int = DECODE_BUFFER_BYTES,
+        timestamps: Sequence[float] | None = None,
+    ) -> None:
+        self.video_path = video_path
+        self.timestamps = timestamps
+        self.chunks = plan_chunks(list(frame_numbers), max_workers)
+        self.transform = transform
+        self.buffer_bytes = buffer_bytes
+        self._stop = threading.Event()
+        self._condition = threading.Condition()
+        self._buffers: list[deque] = []
+        self._buffered_bytes = 0
+        self._consuming = 0
+        self._threads: list[threading.Thread] = []
+
+    @property
+    def worker_count(self) -> int:
+        return len(self.chunks)
+
+    def __enter__(self) -> "ParallelDecoder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[tuple[int, np.ndarray]]:
+        self._start()
+        for chunk_index, buffer in enumerate(self._buffers):
+            with self._condition:
+                self._consuming = chunk_index
+                self._condition.notify_all()
+            while True:
+                with self._condition:
+                    while not buffer:
+                        self._condition.wait()
+                    item, nbytes = buffer.popleft()
+                    self._buffered_bytes -= nbytes
+                    self._condition.notify_all()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._buffers = []
+        self._buffered_bytes = 0
+
+    def _start(self) -> None:
+        if self._threads:
+            return
+        for index, chunk in enumerate(self.chunks):
+            self._buffers.append(deque())
+            thread = threading.Thread(
+                target=self._decode_chunk,
+                args=(index, chunk),
+                name=f"decode-{index}",
+                daemon=True,
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _put(self, chunk_index: int, item: object, nbytes: int = 0) -> bool:
+        buffer = self._buffers[chunk_index]
+        with self._condition:
+            while not self._stop.is_set():
+                if chunk_index == self._consuming:
+                    # The consumer is draining this chunk, so a short queue is enough and cannot deadlock.
+                    if len(buffer) < CURRENT_CHUNK_FRAMES:
+                        break
+                elif chunk_index > self._consuming and self._buffered_bytes + nbytes <= self.buffer_bytes:
+                    break
+                self._condition.wait()
+            if self._stop.is_set():
+                return False
+            buffer.append((item, nbytes))
+            self._buffered_bytes += nbytes
+            self._condition.notify_all()
+            return True
+
+    def _decode_chunk(self, chunk_index: int, chunk: list[int]) -> None:
+        reader = VideoReader()
+        try:
+            reader.open(str(self.video_path), self.timestamps)
+            previous: tuple[int, np.ndarray] | None = None
+            for frame_number, rgb in reader.read_frames_rgb(chunk):
+                if previous is not None and previous[0] == frame_number:
+                    frame = previous[1]
+                else:
+                    frame = self.transform(rgb) if self.transform is not None else rgb
+                    previous = (frame_number, frame)
+                if not self._put(chunk_index, (frame_number, frame), frame.nbytes):
+                    return
+            self._put(chunk_index, _DONE)
+        except Exception as exc:
+            self._put(chunk_index, exc)
+        finally:
+            reader.close()
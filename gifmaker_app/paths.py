@@ -0,0 +1,7 @@
+import os
+from pathlib import Path
+
+
+def cache_dir(name: str) -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(cache_home) / "gifmaker" / name
@@ -0,0 +1,167 @@
+from collections.abc import Iterable
+
+import numpy as np
+
+LUT_BITS = 5
+LUT_LEVELS = 1 << LUT_BITS
+LUT_SHIFT = 8 - LUT_BITS
+LUT_SIZE = LUT_LEVELS**3
+
+# 4x4 Bayer matrix, normalised to [-0.5, 0.5).
+_BAYER_4 = (np.array(
+    [
+        [0, 8, 2, 10],
+        [12, 4, 14, 6],
+        [3, 11, 1, 9],
+        [15, 7, 13, 5],
+    ],
+    dtype=np.float32,
+) + 0.5) / 16.0 - 0.5
+
+
+def _rgb_keys(rgb: np.ndarray) -> np.ndarray:
+    reduced = (rgb >> LUT_SHIFT).astype(np.uint16)
+    return (reduced[..., 0] << (2 * LUT_BITS)) | (reduced[..., 1] << LUT_BITS) | reduced[..., 2]
+
+
+def _bin_centers() -> np.ndarray:
+    keys = np.arange(LUT_SIZE, dtype=np.int32)
+    r = (keys >> (2 * LUT_BITS)) & (LUT_LEVELS - 1)
+    g = (keys >> LUT_BITS) & (LUT_LEVELS - 1)
+    b = keys & (LUT_LEVELS - 1)
+    step = 1 << LUT_SHIFT
+    return (np.stack([r, g, b], axis=1) * step + step // 2).astype(np.float32)
+
+
+def color_histogram(frames: Iterable[np.ndarray], sample_stride: int = 2) -> tuple[np.ndarray, np.ndarray]:
+    # Per-bin pixel counts and R/G/B sums; the sums keep flat colours exact instead of snapping them to bin centres.
+    histogram = np.zeros(LUT_SIZE, dtype=np.int64)
+    color_sums = np.zeros((LUT_SIZE, 3), dtype=np.float64)
+    for frame in frames:
+        sampled = frame[::sample_stride, ::sample_stride]
+        keys = _rgb_keys(sampled).ravel()
+        histogram += np.bincount(keys, minlength=LUT_SIZE)
+        for channel in range(3):
+            color_sums[:, channel] += np.bincount(keys, weights=sampled[..., channel].ravel(), minlength=LUT_SIZE)
+    return histogram, color_sums
+
+
+def _bin_colors(histogram: np.ndarray, color_sums: np.ndarray) -> np.ndarray:
+    # Mean colour of the pixels in each occupied bin, the bin centre elsewhere.
+    colors = _bin_centers()
+    occupied = histogram > 0
+    colors[occupied] = (color_sums[occupied] / histogram[occupied, None]).astype(np.float32)
+    return colors
+
+
+def _nearest(points: np.ndarray, palette: np.ndarray, chunk: int = 8192) -> np.ndarray:
+    palette = palette.astype(np.float32)
+    palette_norms = np.einsum("ij,ij->i", palette, palette)
+    result = np.empty(len(points), dtype=np.int32)
+    for begin in range(0, len(points), chunk):
+        block = points[begin : begin + chunk]
+        distances = palette_norms[None, :] - 2.0 * (block @ palette.T)
+        result[begin : begin + chunk] = np.argmin(distances, axis=1)
+    return result
+
+
+def _median_cut(points: np.ndarray, weights: np.ndarray, colors: int) -> list[np.ndarray]:
+    def score(box: np.ndarray) -> float:
+        if len(box) < 2:
+            return 0.0
+        extent = points[box].max(axis=0) - points[box].min(axis=0)
+        return float(extent.max()) * float(weights[box].sum())
+
+    boxes = [np.arange(len(points))]
+    scores = [score(boxes[0])]
+    while len(boxes) < colors:
+        best_index = int(np.argmax(scores))
+        if scores[best_index] <= 0.0:
+            break
+
+        box = boxes.pop(best_index)
+        scores.pop(best_index)
+        box_points = points[box]
+        axis = int(np.argmax(box_points.max(axis=0) - box_points.min(axis=0)))
+        order = box[np.argsort(box_points[:, axis], kind="stable")]
+        cumulative = np.cumsum(weights[order])
+        split = int(np.searchsorted(cumulative, cumulative[-1] / 2.0))
+        split = max(1, min(split, len(order) - 1))
+        for half in (order[:split], order[split:]):
+            boxes.append(half)
+            scores.append(score(half))
+    return boxes
+
+
+def build_palette(
+    histogram: np.ndarray,
+    colors: int = 256,
+    refine_iterations: int = 3,
+    points_by_bin: np.ndarray | None = None,
+) -> np.ndarray:
+    colors = max(2, min(256, colors))
+    occupied = np.nonzero(histogram)[0]
+    if len(occupied) == 0:
+        return np.zeros((2, 3), dtype=np.uint8)
+
+    points = (_bin_centers() if points_by_bin is None else points_by_bin)[occupied]
+    weights = histogram[occupied].astype(np.float64)
+    if len(occupied) <= colors:
+        return np.clip(np.round(points), 0, 255).astype(np.uint8)
+
+    boxes = _median_cut(points, weights, colors)
+    palette = np.stack([np.average(points[box], axis=0, weights=weights[box]) for box in boxes])
+
+    for _ in range(refine_iterations):
+        assignment = _nearest(points, palette)
+        totals = np.bincount(assignment, weights=weights, minlength=len(palette))
+        used = totals > 0
+        for channel in range(3):
+            sums = np.bincount(assignment, weights=weights * points[:, channel], minlength=len(palette))
+            palette[used, channel] = sums[used] / totals[used]
+
+    return np.clip(np.round(palette), 0, 255).astype(np.uint8)
+
+
+def _palette_spacing(palette: np.ndarray) -> float:
+    # Typical distance to the nearest other palette colour; the dither has to span it to break up bands.
+    points = palette.astype(np.float32)
+    if len(points) < 2:
+        return 255.0
+    distances = np.sqrt(((points[:, None, :] - points[None, :, :]) ** 2).sum(axis=2))
+    np.fill_diagonal(distances, np.inf)
+    nearest = distances.min(axis=1)
+    # Per-channel step along the grey diagonal, and never less than one LUT bin.
+    return float(max(np.median(nearest) / np.sqrt(3.0), 1 << LUT_SHIFT))
+
+
+class PaletteQuantizer:
+    def __init__(self, palette: np.ndarray, points_by_bin: np.ndarray | None = None) -> None:
+        self.palette = np.asarray(palette, dtype=np.uint8)
+        points = _bin_centers() if points_by_bin is None else points_by_bin
+        self.lut = _nearest(points, self.palette).astype(np.uint8)
+        self.dither_spread = _palette_spacing(self.palette)
+
+    @classmethod
+    def from_frames(cls, frames: Iterable[np.ndarray], colors: int = 256) -> "PaletteQuantizer":
+        histogram, color_sums = color_histogram(frames)
+        points = _bin_colors(histogram, color_sums)
+        return cls(build_palette(histogram, colors, points_by_bin=points), points)
+
+    def palette_bytes(self) -> bytes:
+        return self.palette.tobytes()
+
+    def map(self, rgb: np.ndarray, dither: bool = False) -> np.ndarray:
+        if dither:
+            h, w, _ = rgb.shape
+            threshold = np.tile(_BAYER_4, ((h + 3) // 4, (w + 3) // 4))[:h, :w]
+            offset = np.round(threshold * self.dither_spread).astype(np.int16)[..., None]
+            rgb = np.clip(rgb.astype(np.int16) + offset, 0, 255).astype(np.uint8)
+        return self.lut[_rgb_keys(rgb)]
+
+
+def psnr(reference: np.ndarray, candidate: np.ndarray) -> float:
+    mse = float(np.mean((reference.astype(np.float32) - candidate.astype(np.float32)) ** 2))
+    if mse == 0.0:
+        return float("inf")
+    return 10.0 * np.log10((255.0**2) / mse)
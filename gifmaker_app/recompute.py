@@ -0,0 +1,126 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+FRAME_INTERVAL_MS = 16
+
+
+class RecomputeScheduler(QObject):
+    CROP = "crop"
+    RANGE = "range"
+    SETTINGS = "settings"
+    SIZE = "size"
+
+    def __init__(
+        self,
+        handler: Callable[[set[str]], None],
+        interval_ms: int = FRAME_INTERVAL_MS,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._handler = handler
+        self._dirty: set[str] = set()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+
+    def mark_dirty(self, *flags: str) -> None:
+        self._dirty.update(flags)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self) -> None:
+        self._timer.stop()
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        self._handler(dirty)
+
+
+class ComparisonWorker(QObject):
+    resultReady = Signal(int, object)
+
+    FRAME_CACHE_SIZE = 4
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.generation = 0
+        self._path: Path | None = None
+        self._pending: tuple | None = None
+        self._closing = False
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def request(
+        self,
+        path: Path,
+        start: int,
+        end: int,
+        crop_rect: tuple[int, int, int, int] | None,
+        timestamps: Sequence[float] | None = None,
+    ) -> int:
+        with self._condition:
+            self.generation += 1
+            self._pending = (self.generation, path, start, end, crop_rect, timestamps)
+            self._condition.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="comparison", daemon=True)
+                self._thread.start()
+            return self.generation
+
+    def close(self) -> None:
+        with self._condition:
+            self._closing = True
+            self._pending = None
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        from .frame_ops import build_comparison_rgb, crop_frame
+        from .video_reader import VideoReader
+
+        reader = VideoReader()
+        frames: OrderedDict[int, object] = OrderedDict()
+
+        def read(frame_index: int):
+            if frame_index in frames:
+                frames.move_to_end(frame_index)
+                return frames[frame_index]
+            rgb = reader.read_frame_rgb(frame_index)
+            frames[frame_index] = rgb
+            while len(frames) > self.FRAME_CACHE_SIZE:
+                frames.popitem(last=False)
+            return rgb
+
+        try:
+            while True:
+                with self._condition:
+                    while self._pending is None and not self._closing:
+                        self._condition.wait()
+                    if self._closing:
+                        return
+                    generation, path, start, end, crop_rect, timestamps = self._pending
+                    self._pending = None
+
+                try:
+                    if reader.info is None or reader.info.path != path:
+                        reader.open(str(path), timestamps)
+                        frames.clear()
+                    elif reader.info.timestamps is not timestamps:
+                        # A timestamp index arrived; seeks now land on different frames for VFR video.
+                        reader.info.timestamps = timestamps
+                        frames.clear()
+                    first = crop_frame(read(start), crop_rect)
+                    last = crop_frame(read(end), crop_rect)
+                    result = build_comparison_rgb(first, last)
+                except Exception:
+                    result = None
+                self.resultReady.emit(generation, result)
+        finally:
+            reader.close()
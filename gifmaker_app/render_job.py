@@ -0,0 +1,316 @@
+import os
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from .exporter import ANIMATED_IMAGE_FORMATS, write_export
+from .frame_ops import prepare_frame
+from .frame_spool import FrameStore, FrameView, create_frame_store
+from .loop_effects import CrossfadeLoop
+from .parallel_decode import ParallelDecoder
+from .timestamp_index import apply_timestamp_index, build_timestamp_index, load_timestamp_index
+from .video_reader import VideoReader
+
+OUTPUT_SUFFIXES = {
+    "gif": ".gif",
+    "webp": ".webp",
+    "webp-lossless": ".webp",
+    "apng": ".png",
+    "webm": ".webm",
+    "mp4": ".mp4",
+    "mpeg": ".mpeg",
+}
+# Full renders tried when a max-size output comes out over the limit.
+MAX_SIZE_ATTEMPTS = 3
+
+
+@dataclass
+class RenderSettings:
+    input_path: str
+    start_frame: int = 0
+    end_frame: int | None = None
+    crop_rect: tuple[int, int, int, int] | None = None
+    width: int = 480
+    fps: int = 12
+    quality_percent: int = 80
+    output_format: str = "gif"
+    dither: bool = False
+    dedupe: bool = False
+    boomerang: bool = False
+    crossfade_frames: int = 0
+    max_size_bytes: int | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RenderSettings":
+        if not isinstance(data, dict):
+            raise ValueError("Job settings must be a JSON object.")
+        unknown = set(data) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+        if not isinstance(data.get("input_path"), str):
+            raise ValueError("input_path is required.")
+        if not isinstance(data.get("output_format", "gif"), str):
+            raise ValueError("output_format must be a string.")
+        crop_rect = data.get("crop_rect")
+        if crop_rect is not None and (not isinstance(crop_rect, (list, tuple)) or len(crop_rect) != 4):
+            raise ValueError("crop_rect must be [x, y, w, h].")
+        for name in ("dither", "dedupe", "boomerang"):
+            # bool("false") is True, so only real JSON booleans are accepted.
+            if name in data and not isinstance(data[name], bool):
+                raise ValueError(f"{name} must be true or false.")
+
+        try:
+            settings = cls(**data)
+            settings.start_frame = int(settings.start_frame)
+            settings.end_frame = None if settings.end_frame is None else int(settings.end_frame)
+            settings.width = int(settings.width)
+            settings.fps = int(settings.fps)
+            settings.quality_percent = int(settings.quality_percent)
+            settings.crossfade_frames = int(settings.crossfade_frames)
+            if settings.max_size_bytes is not None:
+                settings.max_size_bytes = int(settings.max_size_bytes)
+            if settings.crop_rect is not None:
+                x, y, w, h = (int(value) for value in settings.crop_rect)
+                settings.crop_rect = (x, y, w, h)
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"Invalid settings: {exc}") from exc
+
+        if not Path(settings.input_path).is_file():
+            raise ValueError(f"Input file not found: {settings.input_path}")
+        if settings.output_format not in OUTPUT_SUFFIXES:
+            raise ValueError(f"Unsupported format: {settings.output_format}")
+        if settings.start_frame < 0 or (settings.end_frame is not None and settings.end_frame <= settings.start_frame):
+            raise ValueError("End must be greater than start.")
+        if not 16 <= settings.width <= 4096 or not 1 <= settings.fps <= 60:
+            raise ValueError("Width must be 16-4096 and fps 1-60.")
+        if not 1 <= settings.quality_percent <= 100:
+            raise ValueError("Quality must be 1-100.")
+        if not 0 <= settings.crossfade_frames <= 60:
+            raise ValueError("crossfade_frames must be 0-60.")
+        if settings.crop_rect is not None and (settings.crop_rect[2] <= 0 or settings.crop_rect[3] <= 0):
+            raise ValueError("Crop width and height must be positive.")
+        if settings.max_size_bytes is not None and settings.output_format != "gif":
+            raise ValueError("max_size_bytes is only supported for gif.")
+        return settings
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class RenderResult:
+    output_bytes: int
+    frame_count: int
+    decode_seconds: float
+    encode_seconds: float
+    notes: list[str] = field(default_factory=list)
+
+
+def format_size(num_bytes: int) -> str:
+    size = float(max(0, num_bytes))
+    units = ["B", "KB", "MB", "GB"]
+    unit_index = 0
+    while size >= 1024.0 and unit_index < len(units) - 1:
+        size /= 1024.0
+        unit_index += 1
+    if unit_index == 0:
+        return f"{int(size)} {units[unit_index]}"
+    return f"{size:.1f} {units[unit_index]}"
+
+
+def _write_frames(
+    frames: FrameStore,
+    output_path: str | Path,
+    output_format: str,
+    fps: int,
+    quality_percent: int,
+    dither: bool,
+    dedupe: bool,
+    boomerang: bool,
+    status: Callable[[str], None] | None,
+    notes: list[str],
+) -> int:
+    encode_frames: Sequence[np.ndarray] = frames
+    frame_repeats: list[int] | None = None
+    if output_format in ANIMATED_IMAGE_FORMATS and dedupe:
+        from .dedupe import find_unique_frames
+
+        if status is not None:
+            status("Dropping duplicate frames...")
+        kept, frame_repeats = find_unique_frames(frames)
+        encode_frames = FrameView(frames, kept)
+        notes.append(f"Dropped {len(frames) - len(kept)} near-duplicate frames")
+
+    order: list[int] | None = None
+    if boomerang:
+        from .loop_effects import boomerang_order
+
+        # The backward half indexes the frames already prepared, so nothing is decoded twice.
+        order, frame_repeats = boomerang_order(len(encode_frames), frame_repeats)
+        notes.append(f"Boomerang: {len(order)} output frames from {len(encode_frames)} prepared")
+
+    if status is not None:
+        status("Encoding...")
+    write_export(
+        encode_frames,
+        str(output_path),
+        output_format,
+        fps,
+        quality_percent,
+        dither=dither,
+        frame_repeats=frame_repeats,
+        order=order,
+    )
+    return len(encode_frames) if order is None else len(order)
+
+
+def render_prepared(
+    prepared: FrameStore,
+    output_path: str | Path,
+    output_format: str,
+    fps: int,
+    quality_percent: int,
+    dither: bool = False,
+    dedupe: bool = False,
+    boomerang: bool = False,
+    max_size_bytes: int | None = None,
+    status: Callable[[str], None] | None = None,
+) -> RenderResult:
+    notes: list[str] = []
+    encode_started = time.perf_counter()
+    if max_size_bytes is None:
+        frame_count = _write_frames(
+            prepared, output_path, output_format, fps, quality_percent, dither, dedupe, boomerang, status, notes
+        )
+    else:
+        from .target_size import TargetSizeSearch, render_candidate
+
+        search = TargetSizeSearch(prepared, fps, quality_percent, max_size_bytes, dither=dither, boomerang=boomerang)
+        for attempt in range(1, MAX_SIZE_ATTEMPTS + 1):
+            if status is not None:
+                status("Searching settings for size limit...")
+            candidate = search.run()
+            if candidate is None:
+                raise RuntimeError(
+                    f"No settings fit under {format_size(max_size_bytes)}. Shorten the range or crop further."
+                )
+            attempt_notes: list[str] = []
+            frames = render_candidate(prepared, fps, candidate)
+            try:
+                frame_count = _write_frames(
+                    frames,
+                    output_path,
+                    output_format,
+                    candidate.fps,
+                    candidate.quality_percent,
+                    dither,
+                    dedupe,
+                    boomerang,
+                    status,
+                    attempt_notes,
+                )
+            finally:
+                frames.close()
+            output_bytes = os.path.getsize(output_path)
+            if output_bytes <= max_size_bytes:
+                break
+            # Trial encodes underestimated this clip; search again with the budget shrunk by the miss.
+            search.max_bytes = int(search.max_bytes * max_size_bytes / output_bytes)
+        notes.append(
+            f"Fitted to {format_size(max_size_bytes)}: {candidate.width}px, {candidate.fps} fps, "
+            f"quality {candidate.quality_percent}% ({search.trials} trial encodes, {attempt} full)"
+        )
+        notes.extend(attempt_notes)
+        if output_bytes > max_size_bytes:
+            notes.append(
+                f"Warning: output is {format_size(output_bytes)}, over the {format_size(max_size_bytes)} limit"
+            )
+
+    return RenderResult(
+        output_bytes=os.path.getsize(output_path),
+        frame_count=frame_count,
+        decode_seconds=0.0,
+        encode_seconds=time.perf_counter() - encode_started,
+        notes=notes,
+    )
+
+
+def render(
+    settings: RenderSettings,
+    output_path: Path,
+    decode_workers: int | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> RenderResult:
+    reader = VideoReader()
+    try:
+        info = reader.open(settings.input_path)
+    finally:
+        reader.close()
+
+    notes: list[str] = []
+    timestamps = load_timestamp_index(info.path)
+    complete = timestamps is not None
+    if timestamps is None:
+        # Only frames up to the job's end need timestamps; a cached prefix that reaches that far is enough.
+        frame_limit = None if settings.end_frame is None else settings.end_frame + 1
+        timestamps = load_timestamp_index(info.path, partial=True)
+        if timestamps is None or frame_limit is None or len(timestamps) < frame_limit:
+            index_started = time.perf_counter()
+            timestamps, complete = build_timestamp_index(info.path, cancelled, frame_limit)
+            notes.append(f"Indexed {len(timestamps)} frame timestamps in {time.perf_counter() - index_started:.2f} s")
+    if not apply_timestamp_index(info, timestamps, trust_count=complete):
+        notes.append("No usable frame timestamps; assuming constant frame rate")
+
+    last_frame = info.frame_count - 1
+    end_frame = last_frame if settings.end_frame is None else min(settings.end_frame, last_frame)
+    if end_frame <= settings.start_frame:
+        raise RuntimeError("End must be greater than start.")
+    frame_numbers = info.sample_frames(settings.start_frame, end_frame, settings.fps)
+
+    crossfade = CrossfadeLoop(len(frame_numbers), settings.crossfade_frames)
+    prepared: FrameStore | None = None
+    decode_started = time.perf_counter()
+    try:
+        with ParallelDecoder(
+            info.path,
+            frame_numbers,
+            transform=lambda rgb: prepare_frame(rgb, settings.crop_rect, settings.width),
+            max_workers=decode_workers,
+            timestamps=info.timestamps,
+        ) as decoder:
+            for _, resized in decoder:
+                if cancelled is not None and cancelled():
+                    raise RuntimeError("Render cancelled.")
+                if prepared is None:
+                    prepared = create_frame_store(crossfade.output_count, resized.shape)
+                blended = crossfade.push(resized)
+                if blended is not None:
+                    prepared.append(blended)
+        if prepared is None:
+            raise RuntimeError("Selected range produced no frames.")
+        for leftover in crossfade.finish():
+            prepared.append(leftover)
+        if crossfade.fade_frames:
+            notes.append(f"Crossfaded {crossfade.fade_frames} frames across the loop seam")
+        decode_seconds = time.perf_counter() - decode_started
+
+        result = render_prepared(
+            prepared,
+            output_path,
+            settings.output_format,
+            settings.fps,
+            settings.quality_percent,
+            dither=settings.dither,
+            dedupe=settings.dedupe,
+            boomerang=settings.boomerang,
+            max_size_bytes=settings.max_size_bytes,
+        )
+        result.decode_seconds = decode_seconds
+        result.notes[:0] = notes
+        return result
+    finally:
+        if prepared is not None:
+            prepared.close()
@@ -0,0 +1,406 @@
+import argparse
+import json
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from .frame_spool import remove_stale_spools
+from .paths import cache_dir
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+MAX_QUEUED_JOBS = 256
+MAX_REQUEST_BYTES = 64 * 1024
+CONTENT_TYPES = {
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".png": "image/apng",
+    ".webm": "video/webm",
+    ".mp4": "video/mp4",
+    ".mpeg": "video/mpeg",
+}
+
+_JOB_PATH = re.compile(r"^/jobs/([0-9a-f]{32})(/result)?$")
+
+
+def default_server_dir() -> Path:
+    return cache_dir("server")
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+class JobQueue:
+    def __init__(self, db_path: Path, max_queued: int = MAX_QUEUED_JOBS) -> None:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_queued = max_queued
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._condition = threading.Condition()
+        with self._condition, self._db:
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    settings TEXT NOT NULL,
+                    submitted_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    output_path TEXT,
+                    output_bytes INTEGER,
+                    frame_count INTEGER,
+                    decode_seconds REAL,
+                    encode_seconds REAL,
+                    notes TEXT,
+                    error TEXT
+                )
+                """
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, submitted_at)")
+            # Jobs that were running when the server stopped start over.
+            self._db.execute("UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'")
+
+    def submit(self, settings: dict) -> dict:
+        job_id = uuid.uuid4().hex
+        with self._condition:
+            queued = self._db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if queued >= self.max_queued:
+                raise QueueFullError(f"Queue is full ({queued} jobs waiting).")
+            with self._db:
+                self._db.execute(
+                    "INSERT INTO jobs (id, status, settings, submitted_at) VALUES (?, 'queued', ?, ?)",
+                    (job_id, json.dumps(settings), time.time()),
+                )
+            self._condition.notify()
+        return self.get(job_id)
+
+    def claim(self, timeout: float) -> tuple[str, dict] | None:
+        with self._condition:
+            row = self._next_queued()
+            if row is None:
+                self._condition.wait(timeout)
+                row = self._next_queued()
+            if row is None:
+                return None
+            with self._db:
+                self._db.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+                    (time.time(), row["id"]),
+                )
+            return row["id"], json.loads(row["settings"])
+
+    def _next_queued(self) -> sqlite3.Row | None:
+        return self._db.execute(
+            "SELECT id, settings FROM jobs WHERE status = 'queued' ORDER BY submitted_at LIMIT 1"
+        ).fetchone()
+
+    def finish(self, job_id: str, output_path: Path, result) -> None:
+        with self._condition, self._db:
+            self._db.execute(
+                """
+                UPDATE jobs SET status = 'done', finished_at = ?, output_path = ?, output_bytes = ?,
+                    frame_count = ?, decode_seconds = ?, encode_seconds = ?, notes = ?
+                WHERE id = ?
+                """,
+                (
+                    time.time(),
+                    str(output_path),
+                    result.output_bytes,
+                    result.frame_count,
+                    result.decode_seconds,
+                    result.encode_seconds,
+                    json.dumps(result.notes),
+                    job_id,
+                ),
+            )
+
+    def fail(self, job_id: str, error: str) -> None:
+        with self._condition, self._db:
+            self._db.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? WHERE id = ?",
+                (time.time(), error, job_id),
+            )
+
+    def wake_all(self) -> None:
+        with self._condition:
+            self._condition.notify_all()
+
+    def get(self, job_id: str) -> dict | None:
+        with self._condition:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return None if row is None else self._job_dict(row)
+
+    def list(self, limit: int = 50) -> list[dict]:
+        with self._condition:
+            rows = self._db.execute("SELECT * FROM jobs ORDER BY submitted_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._job_dict(row) for row in rows]
+
+    def output_path(self, job_id: str) -> Path | None:
+        with self._condition:
+            row = self._db.execute(
+                "SELECT output_path FROM jobs WHERE id = ? AND status = 'done'", (job_id,)
+            ).fetchone()
+        return None if row is None else Path(row["output_path"])
+
+    def metrics(self) -> dict:
+        with self._condition:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            timing = self._db.execute(
+                """
+                SELECT AVG(started_at - submitted_at), MAX(started_at - submitted_at),
+                    AVG(finished_at - started_at), MAX(finished_at - started_at),
+                    AVG(decode_seconds), AVG(encode_seconds)
+                FROM jobs WHERE status = 'done'
+                """
+            ).fetchone()
+            oldest = self._db.execute("SELECT MIN(submitted_at) FROM jobs WHERE status = 'queued'").fetchone()[0]
+        return {
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "oldest_queued_seconds": None if oldest is None else round(time.time() - oldest, 3),
+            "avg_queue_seconds": _rounded(timing[0]),
+            "max_queue_seconds": _rounded(timing[1]),
+            "avg_run_seconds": _rounded(timing[2]),
+            "max_run_seconds": _rounded(timing[3]),
+            "avg_decode_seconds": _rounded(timing[4]),
+            "avg_encode_seconds": _rounded(timing[5]),
+        }
+
+    @staticmethod
+    def _job_dict(row: sqlite3.Row) -> dict:
+        submitted, started, finished = row["submitted_at"], row["started_at"], row["finished_at"]
+        job = {
+            "id": row["id"],
+            "status": row["status"],
+            "settings": json.loads(row["settings"]),
+            "submitted_at": submitted,
+            "started_at": started,
+            "finished_at": finished,
+            "queue_seconds": _rounded(started - submitted if started else None),
+            "run_seconds": _rounded(finished - started if finished and started else None),
+            "decode_seconds": _rounded(row["decode_seconds"]),
+            "encode_seconds": _rounded(row["encode_seconds"]),
+            "output_bytes": row["output_bytes"],
+            "frame_count": row["frame_count"],
+            "notes": json.loads(row["notes"]) if row["notes"] else [],
+            "error": row["error"],
+        }
+        if row["status"] == "done":
+            job["result_url"] = f"/jobs/{row['id']}/result"
+        return job
+
+    def close(self) -> None:
+        with self._condition:
+            self._db.close()
+
+
+def _rounded(value: float | None) -> float | None:
+    return None if value is None else round(value, 3)
+
+
+class RenderWorkerPool:
+    def __init__(self, jobs: JobQueue, results_dir: Path, workers: int = DEFAULT_WORKERS) -> None:
+        from .parallel_decode import default_worker_count
+
+        self.jobs = jobs
+        self.results_dir = results_dir
+        self.workers = max(1, workers)
+        # Share the decode threads between jobs so the box is not oversubscribed when every worker is busy.
+        self.decode_workers = max(1, default_worker_count() // self.workers)
+        self.busy = 0
+        self._busy_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"render-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.jobs.wake_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _run(self) -> None:
+        from .render_job import OUTPUT_SUFFIXES, RenderSettings, render
+
+        while not self._stop.is_set():
+            claimed = self.jobs.claim(timeout=1.0)
+            if claimed is None:
+                continue
+            job_id, data = claimed
+            with self._busy_lock:
+                self.busy += 1
+            try:
+                settings = RenderSettings.from_dict(data)
+                output_path = self.results_dir / f"{job_id}{OUTPUT_SUFFIXES[settings.output_format]}"
+                result = render(settings, output_path, decode_workers=self.decode_workers, cancelled=self._stop.is_set)
+            except Exception as exc:
+                if self._stop.is_set():
+                    # Leave the job running; it is re-queued when the server starts again.
+                    return
+                self.jobs.fail(job_id, str(exc))
+            else:
+                self.jobs.finish(job_id, output_path, result)
+            finally:
+                with self._busy_lock:
+                    self.busy -= 1
+
+
+class RenderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], jobs: JobQueue, pool: RenderWorkerPool) -> None:
+        super().__init__(address, _RequestHandler)
+        self.jobs = jobs
+        self.pool = pool
+        self.started_at = time.time()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: RenderServer
+    server_version = "gifmaker"
+
+    def do_GET(self) -> None:
+        if self.path == "/metrics":
+            metrics = self.server.jobs.metrics()
+            metrics.update(
+                workers=self.server.pool.workers,
+                busy_workers=self.server.pool.busy,
+                decode_threads_per_job=self.server.pool.decode_workers,
+                uptime_seconds=round(time.time() - self.server.started_at, 3),
+            )
+            self._send_json(HTTPStatus.OK, metrics)
+            return
+        if self.path == "/jobs":
+            self._send_json(HTTPStatus.OK, {"jobs": self.server.jobs.list()})
+            return
+
+        match = _JOB_PATH.match(self.path)
+        if match is None:
+            self._send_error(HTTPStatus.NOT_FOUND, "Not found.")
+            return
+        job_id, wants_result = match.group(1), match.group(2)
+        job = self.server.jobs.get(job_id)
+        if job is None:
+            self._send_error(HTTPStatus.NOT_FOUND, "Unknown job.")
+        elif not wants_result:
+            self._send_json(HTTPStatus.OK, job)
+        else:
+            self._send_result(job)
+
+    def do_POST(self) -> None:
+        if self.path != "/jobs":
+            self._send_error(HTTPStatus.NOT_FOUND, "Not found.")
+            return
+
+        from .render_job import RenderSettings
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = 0
+        if length <= 0 or length > MAX_REQUEST_BYTES:
+            self._send_error(HTTPStatus.BAD_REQUEST, "Expected a JSON body.")
+            return
+        try:
+            data = json.loads(self.rfile.read(length))
+            if isinstance(data, dict) and isinstance(data.get("input_path"), str):
+                data["input_path"] = str(Path(data["input_path"]).expanduser().resolve())
+            settings = RenderSettings.from_dict(data)
+        except ValueError as exc:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(exc))
+            return
+
+        try:
+            job = self.server.jobs.submit(settings.to_dict())
+        except QueueFullError as exc:
+            self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, str(exc))
+            return
+        self._send_json(HTTPStatus.ACCEPTED, job, location=f"/jobs/{job['id']}")
+
+    def _send_result(self, job: dict) -> None:
+        if job["status"] != "done":
+            self._send_error(HTTPStatus.CONFLICT, f"Job is {job['status']}.")
+            return
+        output_path = self.server.jobs.output_path(job["id"])
+        if output_path is None or not output_path.is_file():
+            self._send_error(HTTPStatus.GONE, "Result file is missing.")
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", CONTENT_TYPES.get(output_path.suffix, "application/octet-stream"))
+        self.send_header("Content-Length", str(output_path.stat().st_size))
+        self.send_header("Content-Disposition", f'attachment; filename="{output_path.name}"')
+        self.end_headers()
+        with output_path.open("rb") as handle:
+            shutil.copyfileobj(handle, self.wfile)
+
+    def _send_json(self, status: HTTPStatus, payload: dict, location: str | None = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if location is not None:
+            self.send_header("Location", location)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: HTTPStatus, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="gifmaker serve", description="Run the local render server")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Address to bind (default {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to bind (default {DEFAULT_PORT})")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Jobs rendered at the same time (default {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--data-dir",
+        type=Path,
+        default=None,
+        help="Job database and results directory (default ~/.cache/gifmaker/server)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = _parse_args(argv)
+    data_dir = args.data_dir or default_server_dir()
+    remove_stale_spools()
+    jobs = JobQueue(data_dir / "jobs.sqlite3")
+    pool = RenderWorkerPool(jobs, data_dir / "results", workers=args.workers)
+    server = RenderServer((args.host, args.port), jobs, pool)
+    pool.start()
+    host, port = server.server_address[:2]
+    print(f"gifmaker render server on http://{host}:{port} ({pool.workers} workers, data in {data_dir})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.stop()
+        jobs.close()
+    return 0
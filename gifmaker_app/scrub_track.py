@@ -0,0 +1,121 @@
+import math
+import threading
+
+import cv2
+import numpy as np
+from PySide6.QtCore import QObject, Signal
+
+from .frame_spool import FrameStore, create_frame_store
+from .models import VideoInfo
+from .timestamp_index import save_timestamp_index
+from .video_reader import VideoReader
+
+SCRUB_WIDTH = 192
+# Tracks above this size go to a memory-mapped spool instead of RAM.
+SCRUB_MEMORY_LIMIT = 64 * 1024 * 1024
+# Long videos keep every k-th frame so the track never exceeds this, in RAM or on disk.
+SCRUB_BUDGET_BYTES = 512 * 1024 * 1024
+PROGRESS_STEPS = 100
+
+
+class ScrubTrack(QObject):
+    progressChanged = Signal(int, int)
+    timestampsReady = Signal(object)
+
+    def __init__(
+        self,
+        info: VideoInfo,
+        width: int = SCRUB_WIDTH,
+        record_timestamps: bool = True,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.info = info
+        self.record_timestamps = record_timestamps
+        self.width = max(1, min(width, info.width))
+        self.height = max(1, int(round(info.height * (self.width / max(1, info.width)))))
+        self.error: str | None = None
+        frame_bytes = self.width * self.height * 3
+        self.stride = max(1, math.ceil(info.frame_count * frame_bytes / SCRUB_BUDGET_BYTES))
+        self._decoded = 0
+        self._frames: FrameStore = create_frame_store(
+            math.ceil(info.frame_count / self.stride),
+            (self.height, self.width, 3),
+            threshold_bytes=SCRUB_MEMORY_LIMIT,
+        )
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def decoded_count(self) -> int:
+        return self._decoded
+
+    @property
+    def total(self) -> int:
+        return self.info.frame_count
+
+    def frame(self, frame_index: int, exact: bool = False) -> np.ndarray | None:
+        # Without exact, a thinned track answers with the nearest earlier frame it kept.
+        slot, offset = divmod(frame_index, self.stride)
+        if frame_index < 0 or slot >= len(self._frames) or (exact and offset):
+            return None
+        return self._frames[slot]
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="scrub-track", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._frames.close()
+
+    def _run(self) -> None:
+        reader = VideoReader()
+        report_every = max(1, self.total // PROGRESS_STEPS)
+        timestamps: list[float] = []
+        reached_end = False
+        try:
+            reader.open(str(self.info.path))
+            # The timestamp index needs every frame's time, but only frames on the stride are converted.
+            if self.record_timestamps:
+                step = 1
+                frames = reader.scan_frames_rgb(self.total, self.stride)
+            else:
+                step = self.stride
+                frames = reader.read_frames_rgb(range(0, self.total, step))
+            for frame_index, rgb in frames:
+                if self._stop.is_set():
+                    return
+                if rgb is not None:
+                    small = cv2.resize(rgb, (self.width, self.height), interpolation=cv2.INTER_AREA)
+                    self._frames.append(small)
+                if self.record_timestamps:
+                    timestamps.append(reader.position_seconds())
+                self._decoded = frame_index + 1
+                if self._decoded % report_every < step:
+                    self.progressChanged.emit(self._decoded, self.total)
+            reached_end = True
+        except Exception as exc:
+            # Containers often report a few more frames than they decode; keep what we have.
+            self.error = str(exc)
+            # Only a failure with nothing after it is the end; a mid-stream error must not truncate the index.
+            reached_end = reader.capture is not None and not reader.capture.grab()
+        finally:
+            reader.close()
+        if self._stop.is_set():
+            return
+        self.progressChanged.emit(self._decoded, self.total)
+        if self.record_timestamps and timestamps:
+            # The pass already decoded every frame in order, so the timestamp index comes for free.
+            index = np.asarray(timestamps, dtype=np.float64)
+            if reached_end:
+                try:
+                    save_timestamp_index(self.info.path, index)
+                except OSError:
+                    pass
+            self.timestampsReady.emit(index)
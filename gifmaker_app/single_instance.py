@@ -0,0 +1,76 @@
+import getpass
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+CONNECT_TIMEOUT_MS = 500
+WRITE_TIMEOUT_MS = 1000
+
+
+def server_name() -> str:
+    return f"gifmaker-{getpass.getuser()}"
+
+
+def instance_is_running(name: str | None = None) -> bool:
+    socket = QLocalSocket()
+    socket.connectToServer(name or server_name())
+    connected = socket.waitForConnected(CONNECT_TIMEOUT_MS)
+    socket.abort()
+    return connected
+
+
+def forward_to_running_instance(file_path: str, name: str | None = None) -> bool:
+    socket = QLocalSocket()
+    socket.connectToServer(name or server_name())
+    if not socket.waitForConnected(CONNECT_TIMEOUT_MS):
+        return False
+
+    socket.write(f"{file_path}\n".encode("utf-8"))
+    ok = socket.waitForBytesWritten(WRITE_TIMEOUT_MS)
+    socket.disconnectFromServer()
+    return ok
+
+
+class SingleInstanceServer(QObject):
+    fileRequested = Signal(str)
+
+    def __init__(self, name: str | None = None, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.name = name or server_name()
+        self._server = QLocalServer(self)
+        self._server.newConnection.connect(self._on_new_connection)
+        self._buffers: dict[QLocalSocket, bytearray] = {}
+
+    def listen(self) -> bool:
+        if self._server.listen(self.name):
+            return True
+        if instance_is_running(self.name):
+            return False
+        # Nothing answers, so a previous instance crashed and left its socket file behind.
+        QLocalServer.removeServer(self.name)
+        return self._server.listen(self.name)
+
+    def close(self) -> None:
+        self._server.close()
+
+    def _on_new_connection(self) -> None:
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            self._buffers[socket] = bytearray()
+            socket.readyRead.connect(lambda s=socket: self._on_ready_read(s))
+            socket.disconnected.connect(lambda s=socket: self._on_disconnected(s))
+
+    def _on_ready_read(self, socket: QLocalSocket) -> None:
+        buffer = self._buffers.setdefault(socket, bytearray())
+        buffer.extend(bytes(socket.readAll()))
+        while b"\n" in buffer:
+            line, _, rest = bytes(buffer).partition(b"\n")
+            buffer[:] = rest
+            file_path = line.decode("utf-8", errors="replace").strip()
+            if file_path:
+                self.fileRequested.emit(file_path)
+
+    def _on_disconnected(self, socket: QLocalSocket) -> None:
+        self._on_ready_read(socket)
+        self._buffers.pop(socket, None)
+        socket.deleteLater()
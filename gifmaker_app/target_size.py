@@ -0,0 +1,152 @@
+import io
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from .exporter import palette_colors_for_quality, write_gif
+from .frame_spool import FrameStore, create_frame_store
+from .loop_effects import boomerang_length
+
+TRIAL_SAMPLE_FRAMES = 6
+WIDTH_SCALES = (1.0, 0.9, 0.8, 0.7, 0.6, 0.5, 0.4, 0.3, 0.2)
+FPS_SCALES = (1.0, 0.75, 0.5)
+QUALITY_STEPS = (0, -20, -40)
+MIN_WIDTH = 64
+MIN_FPS = 4
+MIN_QUALITY = 10
+# Trial frames are far apart, so they compress worse than neighbouring frames; keep a little headroom anyway.
+SIZE_HEADROOM = 0.95
+
+
+@dataclass(frozen=True)
+class SizeCandidate:
+    width: int
+    fps: int
+    quality_percent: int
+    predicted_bytes: int
+
+    def score(self, base_width: int, base_fps: int, base_quality: int) -> float:
+        width_term = (self.width / base_width) ** 2
+        fps_term = math.sqrt(self.fps / base_fps)
+        colours = palette_colors_for_quality(self.quality_percent)
+        colours_term = (colours / palette_colors_for_quality(base_quality)) ** 0.25
+        return width_term * fps_term * colours_term
+
+
+def output_frame_count(frame_count: int, base_fps: int, fps: int) -> int:
+    return max(1, int(math.ceil(frame_count * fps / base_fps)))
+
+
+def resample_indices(frame_count: int, base_fps: int, fps: int) -> list[int]:
+    count = output_frame_count(frame_count, base_fps, fps)
+    return [min(frame_count - 1, int(round(k * base_fps / fps))) for k in range(count)]
+
+
+def resize_to_width(frame: np.ndarray, width: int) -> np.ndarray:
+    h, w, _ = frame.shape
+    if w == width:
+        return frame
+    height = max(1, int(h * (width / w)))
+    return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+
+def _encoded_size(frames: Sequence[np.ndarray], fps: int, quality_percent: int, dither: bool) -> int:
+    buffer = io.BytesIO()
+    write_gif(frames, buffer, fps, quality_percent, dither=dither)
+    return buffer.tell()
+
+
+class TargetSizeSearch:
+    def __init__(
+        self,
+        frames: FrameStore,
+        base_fps: int,
+        base_quality: int,
+        max_bytes: int,
+        dither: bool = False,
+        sample_frames: int = TRIAL_SAMPLE_FRAMES,
+        boomerang: bool = False,
+    ) -> None:
+        self.frames = frames
+        self.base_fps = base_fps
+        self.base_quality = base_quality
+        self.base_width = frames.shape[1]
+        self.max_bytes = max_bytes
+        self.dither = dither
+        self.boomerang = boomerang
+        self.trials = 0
+
+        count = min(len(frames), max(2, sample_frames))
+        positions = np.linspace(0, len(frames) - 1, num=count, dtype=np.int32)
+        self._samples = [np.array(frames[int(position)]) for position in positions]
+
+    def _predict(self, width: int, fps: int, quality_percent: int) -> int:
+        self.trials += 1
+        samples = [resize_to_width(frame, width) for frame in self._samples]
+        single = _encoded_size(samples[:1], fps, quality_percent, self.dither)
+        full = _encoded_size(samples, fps, quality_percent, self.dither)
+        per_frame = (full - single) / max(1, len(samples) - 1)
+        header = max(0.0, single - per_frame)
+        frame_count = output_frame_count(len(self.frames), self.base_fps, fps)
+        if self.boomerang:
+            frame_count = boomerang_length(frame_count)
+        return int(header + per_frame * frame_count)
+
+    def _largest_fitting_width(self, fps: int, quality_percent: int) -> SizeCandidate | None:
+        widths = sorted(
+            {min(self.base_width, max(MIN_WIDTH, int(self.base_width * scale))) for scale in WIDTH_SCALES},
+            reverse=True,
+        )
+        budget = self.max_bytes * SIZE_HEADROOM
+
+        # Size grows with width, so binary search for the widest setting under budget.
+        best: SizeCandidate | None = None
+        low, high = 0, len(widths) - 1
+        while low <= high:
+            middle = (low + high) // 2
+            predicted = self._predict(widths[middle], fps, quality_percent)
+            if predicted <= budget:
+                best = SizeCandidate(widths[middle], fps, quality_percent, predicted)
+                high = middle - 1
+            else:
+                low = middle + 1
+        return best
+
+    def run(self) -> SizeCandidate | None:
+        fps_options = sorted(
+            {min(self.base_fps, max(MIN_FPS, int(round(self.base_fps * scale)))) for scale in FPS_SCALES},
+            reverse=True,
+        )
+        quality_options = sorted(
+            {min(self.base_quality, max(MIN_QUALITY, self.base_quality + step)) for step in QUALITY_STEPS},
+            reverse=True,
+        )
+
+        best: SizeCandidate | None = None
+        best_score = -1.0
+        for fps in fps_options:
+            for quality_percent in quality_options:
+                candidate = self._largest_fitting_width(fps, quality_percent)
+                if candidate is None:
+                    continue
+                score = candidate.score(self.base_width, self.base_fps, self.base_quality)
+                if score > best_score:
+                    best, best_score = candidate, score
+        return best
+
+
+def render_candidate(frames: FrameStore, base_fps: int, candidate: SizeCandidate) -> FrameStore:
+    indices = resample_indices(len(frames), base_fps, candidate.fps)
+    output: FrameStore | None = None
+    for index in indices:
+        frame = resize_to_width(frames[index], candidate.width)
+        if output is None:
+            output = create_frame_store(len(indices), frame.shape)
+        output.append(frame)
+    if output is None:
+        raise RuntimeError("No frames to render.")
+    return output
+
@@ -0,0 +1,126 @@
+import math
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from pathlib import Path
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtGui import QImage, QPixmap
+
+THUMB_HEIGHT = 80
+MAX_THUMBNAILS = 512
+
+
+def thumbnail_level(frames_per_slot: float) -> int:
+    return max(0, int(math.ceil(math.log2(max(1.0, frames_per_slot)))))
+
+
+def thumbnail_frames(first: int, last: int, level: int) -> list[int]:
+    # Frames sit on a 2**level grid, so coarser levels are subsets of finer ones and stay cached across zooms.
+    spacing = 1 << level
+    start = (max(0, first) // spacing) * spacing
+    return list(range(start, last + 1, spacing))
+
+
+class ThumbnailCache(QObject):
+    thumbnailReady = Signal(int)
+    _decoded = Signal(int, int, object)
+
+    def __init__(
+        self,
+        video_path: Path,
+        thumb_height: int = THUMB_HEIGHT,
+        max_thumbnails: int = MAX_THUMBNAILS,
+        parent: QObject | None = None,
+        timestamps: Sequence[float] | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.video_path = video_path
+        self.timestamps = timestamps
+        self.thumb_height = thumb_height
+        self.max_thumbnails = max_thumbnails
+        self._pixmaps: OrderedDict[int, QPixmap] = OrderedDict()
+        self._pending: list[int] = []
+        self._condition = threading.Condition()
+        self._closing = False
+        # Bumped when seeks change meaning, so thumbnails decoded before that are dropped.
+        self._generation = 0
+        self._thread: threading.Thread | None = None
+        self._decoded.connect(self._on_decoded)
+
+    def get(self, frame_index: int) -> QPixmap | None:
+        pixmap = self._pixmaps.get(frame_index)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(frame_index)
+        return pixmap
+
+    def store(self, frame_index: int, pixmap: QPixmap) -> None:
+        self._pixmaps[frame_index] = pixmap
+        self._pixmaps.move_to_end(frame_index)
+        while len(self._pixmaps) > self.max_thumbnails:
+            self._pixmaps.popitem(last=False)
+
+    def request(self, frame_indices: list[int]) -> None:
+        wanted = [index for index in frame_indices if index not in self._pixmaps]
+        with self._condition:
+            # Replacing the queue cancels anything that has scrolled out of view.
+            self._pending = wanted
+            self._condition.notify()
+            if wanted and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="thumbnails", daemon=True)
+                self._thread.start()
+
+    def set_timestamps(self, timestamps: Sequence[float] | None) -> None:
+        with self._condition:
+            self.timestamps = timestamps
+            self._generation += 1
+            self._pending = []
+        self._pixmaps.clear()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closing = True
+            self._pending = []
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._pixmaps.clear()
+
+    def _on_decoded(self, generation: int, frame_index: int, image: QImage) -> None:
+        if self._closing or generation != self._generation:
+            return
+        self.store(frame_index, QPixmap.fromImage(image))
+        self.thumbnailReady.emit(frame_index)
+
+    def _run(self) -> None:
+        import cv2
+
+        from .video_reader import VideoReader
+
+        reader = VideoReader()
+        try:
+            reader.open(str(self.video_path))
+            while True:
+                with self._condition:
+                    while not self._pending and not self._closing:
+                        self._condition.wait()
+                    if self._closing:
+                        return
+                    frame_index = self._pending.pop(0)
+                    generation = self._generation
+                    reader.info.timestamps = self.timestamps
+
+                try:
+                    rgb = reader.read_frame_rgb(frame_index)
+                except Exception:
+                    continue
+                h, w, _ = rgb.shape
+                width = max(1, int(w * (self.thumb_height / h)))
+                small = cv2.resize(rgb, (width, self.thumb_height), interpolation=cv2.INTER_AREA)
+                image = QImage(small.data, width, self.thumb_height, 3 * width, QImage.Format_RGB888).copy()
+                self._decoded.emit(generation, frame_index, image)
+        except Exception:
+            return
+        finally:
+            reader.close()
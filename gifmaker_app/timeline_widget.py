@@ -1,15 +1,25 @@
-from PySide6.QtCore import Qt, Signal
+import math
+from collections.abc import Callable
+
+from PySide6.QtCore import QRect, Qt, Signal
 from PySide6.QtGui import QColor, QPainter, QPen, QPixmap
 from PySide6.QtWidgets import QSizePolicy, QWidget
 
+from .thumbnail_cache import thumbnail_frames, thumbnail_level
+
 
 class TimelineWidget(QWidget):
     currentFrameChanged = Signal(int)
     rangeChanged = Signal(int, int)
+    thumbnailsNeeded = Signal(list)
 
     HANDLE_RADIUS = 7
     KNOB_RADIUS = 6
     PADDING = 10
+    MIN_VIEW_FRAMES = 20
+    ZOOM_STEP = 0.8
+    # How many coarser grid levels to try when a thumbnail slot has not been decoded yet.
+    FALLBACK_LEVELS = 6
 
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
@@ -21,10 +31,17 @@ class TimelineWidget(QWidget):
         self.current_frame = 0
         self.start_frame = 0
         self.end_frame = 0
-        self.thumbnails: list[QPixmap] = []
+        self.view_start = 0.0
+        self.view_span = 0.0
+        self.thumbnail_aspect = 16 / 9
+        self.scrub_progress = 0.0
+        self._thumbnail_provider: Callable[[int], QPixmap | None] | None = None
+        self._scrub_provider: Callable[[int], QPixmap | None] | None = None
+        self._requested_thumbnails: list[int] = []
 
         self._dragging: str | None = None
         self._hover_handle: str | None = None
+        self._hover_frame: int | None = None
 
     def set_video_data(
         self,
@@ -32,13 +49,71 @@ class TimelineWidget(QWidget):
         start_frame: int,
         end_frame: int,
         current_frame: int,
-        thumbnails: list[QPixmap],
+        thumbnail_aspect: float,
     ) -> None:
         self.frame_count = max(frame_count, 1)
         self.start_frame = max(0, min(start_frame, self.frame_count - 1))
         self.end_frame = max(self.start_frame, min(end_frame, self.frame_count - 1))
         self.current_frame = max(0, min(current_frame, self.frame_count - 1))
-        self.thumbnails = thumbnails
+        self.thumbnail_aspect = max(0.1, thumbnail_aspect)
+        self.view_start = 0.0
+        self.view_span = float(self.frame_count - 1)
+        self._requested_thumbnails = []
+        self._request_visible_thumbnails()
+        self.update()
+
+    def set_thumbnail_provider(self, provider: Callable[[int], QPixmap | None] | None) -> None:
+        self._thumbnail_provider = provider
+        self._requested_thumbnails = []
+        self._request_visible_thumbnails()
+        self.update()
+
+    def set_view(self, start: float, span: float) -> None:
+        full_span = float(max(0, self.frame_count - 1))
+        span = max(min(float(self.MIN_VIEW_FRAMES), full_span), min(span, full_span))
+        start = max(0.0, min(start, full_span - span))
+        if (start, span) == (self.view_start, self.view_span):
+            return
+        self.view_start = start
+        self.view_span = span
+        self._request_visible_thumbnails()
+        self.update()
+
+    def is_zoomed(self) -> bool:
+        return self.view_span < self.frame_count - 1
+
+    def _thumbnail_grid(self) -> tuple[int, list[int]]:
+        timeline = self._timeline_rect()
+        thumb_width = max(1.0, timeline.height() * self.thumbnail_aspect)
+        slots = max(1.0, timeline.width() / thumb_width)
+        level = thumbnail_level(max(1.0, self.view_span) / slots)
+        last = min(self.frame_count - 1, int(math.ceil(self.view_start + self.view_span)))
+        return level, thumbnail_frames(int(self.view_start), last, level)
+
+    def _request_visible_thumbnails(self) -> None:
+        if self._thumbnail_provider is None or self.frame_count <= 1:
+            return
+        _, frames = self._thumbnail_grid()
+        if frames != self._requested_thumbnails:
+            self._requested_thumbnails = frames
+            self.thumbnailsNeeded.emit(frames)
+
+    def _visible_thumbnail(self, frame: int, level: int) -> QPixmap | None:
+        if self._thumbnail_provider is None:
+            return None
+        for fallback in range(level, level + self.FALLBACK_LEVELS + 1):
+            spacing = 1 << fallback
+            pixmap = self._thumbnail_provider((frame // spacing) * spacing)
+            if pixmap is not None:
+                return pixmap
+        return None
+
+    def set_scrub_provider(self, provider: Callable[[int], QPixmap | None] | None) -> None:
+        self._scrub_provider = provider
+        self.update()
+
+    def set_scrub_progress(self, fraction: float) -> None:
+        self.scrub_progress = max(0.0, min(1.0, fraction))
         self.update()
 
     def set_current_frame(self, frame: int) -> None:
@@ -57,20 +132,23 @@ class TimelineWidget(QWidget):
             self.rangeChanged.emit(start, end)
         self.update()
 
-    def _frame_to_x(self, frame: int) -> int:
+    def _frame_to_x(self, frame: float) -> int:
         timeline = self._timeline_rect()
-        if self.frame_count <= 1:
+        if self.frame_count <= 1 or self.view_span <= 0:
             return timeline.left()
         width = max(1, timeline.width() - 1)
-        return timeline.left() + int((frame / (self.frame_count - 1)) * width)
+        return timeline.left() + int(((frame - self.view_start) / self.view_span) * width)
 
-    def _x_to_frame(self, x: int) -> int:
+    def _x_to_frame_float(self, x: float) -> float:
         timeline = self._timeline_rect()
-        if self.frame_count <= 1:
-            return 0
         width = max(1, timeline.width() - 1)
         pos = max(timeline.left(), min(x, timeline.right())) - timeline.left()
-        return int(round((pos / width) * (self.frame_count - 1)))
+        return self.view_start + (pos / width) * self.view_span
+
+    def _x_to_frame(self, x: int) -> int:
+        if self.frame_count <= 1:
+            return 0
+        return max(0, min(self.frame_count - 1, int(round(self._x_to_frame_float(x)))))
 
     def _timeline_rect(self):
         return self.rect().adjusted(self.PADDING, self.PADDING, -self.PADDING, -self.PADDING)
@@ -83,20 +161,29 @@ class TimelineWidget(QWidget):
         timeline = self._timeline_rect()
         painter.fillRect(timeline, QColor("#1f1f1f"))
 
-        if self.thumbnails:
-            thumb_width = timeline.width() / len(self.thumbnails)
-            for index, pixmap in enumerate(self.thumbnails):
-                x = int(timeline.left() + index * thumb_width)
-                w = int(thumb_width + 1)
-                target = timeline.adjusted(x - timeline.left(), 0, -(timeline.right() - (x + w)), 0)
-                painter.drawPixmap(target, pixmap)
+        if self._thumbnail_provider is not None and self.frame_count > 1:
+            painter.setClipRect(timeline)
+            level, frames = self._thumbnail_grid()
+            spacing = 1 << level
+            for frame in frames:
+                pixmap = self._visible_thumbnail(frame, level)
+                if pixmap is None:
+                    continue
+                x = self._frame_to_x(frame)
+                w = self._frame_to_x(frame + spacing) - x + 1
+                painter.drawPixmap(QRect(x, timeline.top(), max(1, w), timeline.height()), pixmap)
+            painter.setClipping(False)
 
         start_x = self._frame_to_x(self.start_frame)
         end_x = self._frame_to_x(self.end_frame)
+        reach = self.KNOB_RADIUS + 2
+        painter.setClipRect(self.rect().adjusted(self.PADDING - reach, 0, reach - self.PADDING, 0))
 
         overlay = QColor(0, 0, 0, 120)
-        painter.fillRect(timeline.left(), timeline.top(), max(0, start_x - timeline.left()), timeline.height(), overlay)
-        painter.fillRect(end_x, timeline.top(), max(0, timeline.right() - end_x), timeline.height(), overlay)
+        left_shade = max(0, min(start_x, timeline.right()) - timeline.left())
+        right_shade_x = max(end_x, timeline.left())
+        painter.fillRect(timeline.left(), timeline.top(), left_shade, timeline.height(), overlay)
+        painter.fillRect(right_shade_x, timeline.top(), max(0, timeline.right() - right_shade_x), timeline.height(), overlay)
 
         current_x = self._frame_to_x(self.current_frame)
         painter.setPen(QPen(QColor("#f7d154"), 2))
@@ -131,6 +218,42 @@ class TimelineWidget(QWidget):
             end_radius * 2,
         )
 
+        painter.setClipping(False)
+        if self.is_zoomed():
+            full_span = max(1, self.frame_count - 1)
+            view_x = timeline.left() + int(timeline.width() * self.view_start / full_span)
+            view_w = max(4, int(timeline.width() * self.view_span / full_span))
+            painter.fillRect(timeline.left(), timeline.top(), timeline.width(), 3, QColor(255, 255, 255, 40))
+            painter.fillRect(view_x, timeline.top(), view_w, 3, QColor("#e5e5e5"))
+
+        if self.scrub_progress < 1.0:
+            painter.fillRect(
+                timeline.left(),
+                timeline.bottom() - 2,
+                int(timeline.width() * self.scrub_progress),
+                3,
+                QColor("#38bdf8"),
+            )
+
+        self._paint_hover_preview(painter, timeline)
+
+    def _paint_hover_preview(self, painter: QPainter, timeline) -> None:
+        if self._hover_frame is None or self._scrub_provider is None or self._hover_handle is not None:
+            return
+        pixmap = self._scrub_provider(self._hover_frame)
+        if pixmap is None or pixmap.isNull():
+            return
+
+        height = timeline.height() - 8
+        width = max(1, int(pixmap.width() * (height / max(1, pixmap.height()))))
+        x = self._frame_to_x(self._hover_frame) - width // 2
+        x = max(timeline.left(), min(x, timeline.right() - width))
+        y = timeline.top() + 4
+        painter.drawPixmap(x, y, width, height, pixmap)
+        painter.setBrush(Qt.NoBrush)
+        painter.setPen(QPen(QColor("#f7d154"), 1))
+        painter.drawRect(x, y, width, height)
+
     def _update_hover_and_cursor(self, x: int) -> None:
         start_x = self._frame_to_x(self.start_frame)
         end_x = self._frame_to_x(self.end_frame)
@@ -163,6 +286,7 @@ class TimelineWidget(QWidget):
             self._dragging = "end"
         else:
             self._dragging = "current"
+            self._hover_frame = None
             frame = self._x_to_frame(x)
             self.current_frame = frame
             self.currentFrameChanged.emit(frame)
@@ -174,6 +298,7 @@ class TimelineWidget(QWidget):
 
         if self._dragging is None:
             self._update_hover_and_cursor(x)
+            self._set_hover_frame(self._x_to_frame(x))
             return
 
         frame = self._x_to_frame(x)
@@ -193,8 +318,40 @@ class TimelineWidget(QWidget):
         self._dragging = None
         self._update_hover_and_cursor(x)
 
+    def _set_hover_frame(self, frame: int | None) -> None:
+        if frame != self._hover_frame:
+            self._hover_frame = frame
+            if self._scrub_provider is not None:
+                self.update()
+
+    def wheelEvent(self, event) -> None:
+        if self.frame_count <= 1:
+            return
+        delta_x = event.angleDelta().x()
+        delta_y = event.angleDelta().y()
+        pan = bool(event.modifiers() & Qt.ShiftModifier) or abs(delta_x) > abs(delta_y)
+        if pan:
+            steps = (delta_x or delta_y) / 120.0
+            self.set_view(self.view_start - steps * self.view_span * 0.1, self.view_span)
+        else:
+            anchor = self._x_to_frame_float(event.position().x())
+            span = self.view_span * (self.ZOOM_STEP ** (delta_y / 120.0))
+            span = max(min(float(self.MIN_VIEW_FRAMES), self.frame_count - 1), min(span, self.frame_count - 1))
+            ratio = (anchor - self.view_start) / self.view_span if self.view_span > 0 else 0.0
+            self.set_view(anchor - ratio * span, span)
+        event.accept()
+
+    def mouseDoubleClickEvent(self, event) -> None:
+        if event.button() == Qt.LeftButton and self.is_zoomed():
+            self.set_view(0.0, float(self.frame_count - 1))
+
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        self._request_visible_thumbnails()
+
     def leaveEvent(self, event) -> None:
         del event
+        self._hover_frame = None
         self._hover_handle = None
         self.setCursor(Qt.ArrowCursor)
         self.update()
@@ -0,0 +1,88 @@
+import hashlib
+import os
+import tempfile
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+import numpy as np
+
+from .models import VideoInfo
+from .paths import cache_dir
+
+
+def default_index_dir() -> Path:
+    return cache_dir("index")
+
+
+def index_path(video_path: Path, directory: Path | None = None, partial: bool = False) -> Path:
+    stat = video_path.stat()
+    key = f"{video_path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}"
+    suffix = ".partial.npy" if partial else ".npy"
+    return (directory or default_index_dir()) / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}{suffix}"
+
+
+def usable_timestamps(timestamps: Sequence[float]) -> bool:
+    # Some backends report no timestamps (all zero) or non-monotonic ones; frame numbers are safer then.
+    return len(timestamps) >= 2 and bool(np.all(np.diff(np.asarray(timestamps, dtype=np.float64)) > 0))
+
+
+def load_timestamp_index(video_path: Path, partial: bool = False) -> np.ndarray | None:
+    # A partial index covers only the first frames of the file, so its length is not the frame count.
+    try:
+        return np.load(index_path(video_path, partial=partial), allow_pickle=False)
+    except (OSError, ValueError):
+        return None
+
+
+def save_timestamp_index(video_path: Path, timestamps: Sequence[float], partial: bool = False) -> None:
+    path = index_path(video_path, partial=partial)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(prefix="index-", suffix=".npy", dir=path.parent)
+    try:
+        with os.fdopen(handle, "wb") as stream:
+            np.save(stream, np.asarray(timestamps, dtype=np.float64))
+        # Render workers may index the same file concurrently; replace atomically.
+        os.replace(temp_path, path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+    if not partial:
+        index_path(video_path, partial=True).unlink(missing_ok=True)
+
+
+def build_timestamp_index(
+    video_path: Path,
+    cancelled: Callable[[], bool] | None = None,
+    frame_limit: int | None = None,
+) -> tuple[np.ndarray, bool]:
+    import cv2
+
+    capture = cv2.VideoCapture(str(video_path))
+    if not capture.isOpened():
+        raise RuntimeError("Could not open video file.")
+    timestamps: list[float] = []
+    complete = False
+    try:
+        # grab() demuxes and decodes without the colour conversion, which is all the timestamps need.
+        while frame_limit is None or len(timestamps) < frame_limit:
+            if not capture.grab():
+                complete = True
+                break
+            if cancelled is not None and cancelled():
+                raise RuntimeError("Indexing cancelled.")
+            timestamps.append(capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+    finally:
+        capture.release()
+    index = np.asarray(timestamps, dtype=np.float64)
+    save_timestamp_index(video_path, index, partial=not complete)
+    return index, complete
+
+
+def apply_timestamp_index(info: VideoInfo, timestamps: np.ndarray | None, trust_count: bool = True) -> bool:
+    if timestamps is None or not usable_timestamps(timestamps):
+        return False
+    info.timestamps = timestamps
+    if trust_count:
+        # The index counts frames that actually decode; CAP_PROP_FRAME_COUNT is only the container's claim.
+        info.frame_count = len(timestamps)
+    return True
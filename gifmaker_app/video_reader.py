@@ -1,17 +1,30 @@
-from pathlib import Path
+from __future__ import annotations
 
-import cv2
-import numpy as np
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 from .models import VideoInfo
 
+if TYPE_CHECKING:
+    import cv2
+    import numpy as np
+
+
+# Forward gaps up to this many frames are decoded through rather than seeked over.
+SEQUENTIAL_READ_LIMIT = 48
+
 
 class VideoReader:
     def __init__(self) -> None:
         self.capture: cv2.VideoCapture | None = None
         self.info: VideoInfo | None = None
+        self._position = 0
+        self._last_rgb: np.ndarray | None = None
+
+    def open(self, file_path: str, timestamps: Sequence[float] | None = None) -> VideoInfo:
+        import cv2
 
-    def open(self, file_path: str) -> VideoInfo:
         self.close()
         capture = cv2.VideoCapture(file_path)
         if not capture.isOpened():
@@ -29,22 +42,96 @@ class VideoReader:
             fps = 24.0
 
         self.capture = capture
-        self.info = VideoInfo(Path(file_path), frame_count, fps, width, height)
+        self.info = VideoInfo(Path(file_path), frame_count, fps, width, height, timestamps)
+        self._position = 0
+        self._last_rgb = None
         return self.info
 
+    def _seek(self, frame_index: int) -> None:
+        import cv2
+
+        timestamps = self.info.timestamps
+        if timestamps is not None and frame_index < len(timestamps):
+            # Frame-number seeks assume a constant frame rate; on VFR video the indexed time lands on the right frame.
+            self.capture.set(cv2.CAP_PROP_POS_MSEC, float(timestamps[frame_index]) * 1000.0)
+        else:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+
     def read_frame_rgb(self, frame_index: int) -> np.ndarray:
         if self.capture is None or self.info is None:
             raise RuntimeError("No video loaded.")
 
+        import cv2
+
         idx = max(0, min(frame_index, self.info.frame_count - 1))
-        self.capture.set(cv2.CAP_PROP_POS_FRAMES, idx)
+        self._seek(idx)
         ok, frame_bgr = self.capture.read()
         if not ok or frame_bgr is None:
             raise RuntimeError(f"Failed to read frame {idx}.")
-        return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+        self._position = idx + 1
+        self._last_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+        return self._last_rgb
+
+    def read_frames_rgb(self, frame_indices: Iterable[int]) -> Iterator[tuple[int, np.ndarray]]:
+        if self.capture is None or self.info is None:
+            raise RuntimeError("No video loaded.")
+
+        import cv2
+
+        for frame_index in frame_indices:
+            idx = max(0, min(frame_index, self.info.frame_count - 1))
+            if idx == self._position - 1 and self._last_rgb is not None:
+                # Sampling above the source rate repeats frames; hand back the one just decoded instead of seeking.
+                yield idx, self._last_rgb
+                continue
+            gap = idx - self._position
+            if gap < 0 or gap > SEQUENTIAL_READ_LIMIT:
+                self._seek(idx)
+            else:
+                for _ in range(gap):
+                    if not self.capture.grab():
+                        raise RuntimeError(f"Failed to read frame {idx}.")
+            ok, frame_bgr = self.capture.read()
+            if not ok or frame_bgr is None:
+                raise RuntimeError(f"Failed to read frame {idx}.")
+            self._position = idx + 1
+            self._last_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+            yield idx, self._last_rgb
+
+    def scan_frames_rgb(self, frame_count: int, keep_every: int = 1) -> Iterator[tuple[int, np.ndarray | None]]:
+        if self.capture is None or self.info is None:
+            raise RuntimeError("No video loaded.")
+
+        import cv2
+
+        # One pass over every frame from the start; frames off the keep_every grid are grabbed but not converted.
+        if self._position:
+            self._seek(0)
+        for idx in range(frame_count):
+            if idx % keep_every:
+                if not self.capture.grab():
+                    raise RuntimeError(f"Failed to read frame {idx}.")
+                self._last_rgb = None
+            else:
+                ok, frame_bgr = self.capture.read()
+                if not ok or frame_bgr is None:
+                    raise RuntimeError(f"Failed to read frame {idx}.")
+                self._last_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+            self._position = idx + 1
+            yield idx, self._last_rgb
+
+    def position_seconds(self) -> float:
+        if self.capture is None:
+            raise RuntimeError("No video loaded.")
+
+        import cv2
+
+        # Presentation time of the frame read last, as reported by the container.
+        return self.capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
 
     def close(self) -> None:
         if self.capture is not None:
             self.capture.release()
             self.capture = None
         self.info = None
+        self._last_rgb = None
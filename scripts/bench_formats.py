@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Compare output size and encode time of the animated export formats on the same clip.
+
+Usage: python scripts/bench_formats.py [video-file] [--frames N] [--width W] [--fps F] [--quality Q]
+Without a video file a synthetic gradient clip is used.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_quantizer import load_frames  # noqa: E402
+
+from gifmaker_app.exporter import write_export  # noqa: E402
+
+FORMATS = (("gif", ".gif"), ("webp", ".webp"), ("webp-lossless", ".webp"), ("apng", ".png"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("video", nargs="?")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--width", type=int, default=480)
+    parser.add_argument("--fps", type=int, default=12)
+    parser.add_argument("--quality", type=int, default=80)
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames, args.width)
+    h, w, _ = frames[0].shape
+    print(f"{len(frames)} frames at {w}x{h}, {args.fps} fps, quality {args.quality}")
+
+    baseline: tuple[float, int] | None = None
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for output_format, suffix in FORMATS:
+            path = Path(tmp_dir) / f"out-{output_format}{suffix}"
+            started = time.perf_counter()
+            write_export(frames, str(path), output_format, args.fps, args.quality)
+            elapsed = time.perf_counter() - started
+            size = path.stat().st_size
+            if baseline is None:
+                baseline = (elapsed, size)
+            print(
+                f"{output_format:<14} {size / 1024:10.1f} KB ({size / baseline[1]:5.2f}x gif)"
+                f"  {elapsed:7.3f} s ({elapsed / baseline[0]:5.2f}x gif)"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
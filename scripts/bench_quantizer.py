@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Compare the LUT quantizer against Pillow's adaptive palette for speed and PSNR.
+
+Usage: python scripts/bench_quantizer.py [video-file] [--frames N] [--width W] [--colors C]
+Without a video file a synthetic gradient clip is used.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from gifmaker_app.quantizer import PaletteQuantizer, psnr  # noqa: E402
+
+
+def load_frames(path: str | None, count: int, width: int) -> list[np.ndarray]:
+    if path is None:
+        height = width * 9 // 16
+        yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+        frames = []
+        for index in range(count):
+            phase = index / max(1, count)
+            r = 127 + 127 * np.sin(xx / 37.0 + phase * 6.28)
+            g = 127 + 127 * np.sin(yy / 23.0 - phase * 3.14)
+            b = 127 + 127 * np.cos((xx + yy) / 51.0 + phase)
+            frames.append(np.stack([r, g, b], axis=-1).astype(np.uint8))
+        return frames
+
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < count:
+        ok, frame_bgr = capture.read()
+        if not ok:
+            break
+        h, w, _ = frame_bgr.shape
+        resized = cv2.resize(frame_bgr, (width, max(1, int(h * width / w))), interpolation=cv2.INTER_AREA)
+        frames.append(cv2.cvtColor(resized, cv2.COLOR_BGR2RGB))
+    capture.release()
+    if not frames:
+        raise SystemExit(f"Could not read frames from {path}")
+    return frames
+
+
+def bench_pillow(frames: list[np.ndarray], colors: int) -> tuple[float, float]:
+    started = time.perf_counter()
+    outputs = [
+        Image.fromarray(frame).convert("P", palette=Image.Palette.ADAPTIVE, colors=colors) for frame in frames
+    ]
+    elapsed = time.perf_counter() - started
+    quality = np.mean([psnr(frame, np.asarray(out.convert("RGB"))) for frame, out in zip(frames, outputs)])
+    return elapsed, float(quality)
+
+
+def bench_lut(frames: list[np.ndarray], colors: int, dither: bool) -> tuple[float, float]:
+    started = time.perf_counter()
+    quantizer = PaletteQuantizer.from_frames(frames, colors)
+    indices = [quantizer.map(frame, dither=dither) for frame in frames]
+    elapsed = time.perf_counter() - started
+    quality = np.mean([psnr(frame, quantizer.palette[idx]) for frame, idx in zip(frames, indices)])
+    return elapsed, float(quality)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("video", nargs="?")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--width", type=int, default=480)
+    parser.add_argument("--colors", type=int, default=256)
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames, args.width)
+    h, w, _ = frames[0].shape
+    print(f"{len(frames)} frames at {w}x{h}, {args.colors} colours")
+
+    rows = [
+        ("pillow adaptive", *bench_pillow(frames, args.colors)),
+        ("lut", *bench_lut(frames, args.colors, dither=False)),
+        ("lut + bayer", *bench_lut(frames, args.colors, dither=True)),
+    ]
+    for name, elapsed, quality in rows:
+        per_frame_ms = 1000.0 * elapsed / len(frames)
+        print(f"{name:<16} {elapsed:7.3f} s  {per_frame_ms:7.2f} ms/frame  PSNR {quality:6.2f} dB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
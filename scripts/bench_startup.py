@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Measure GIF Maker startup: per-module import time and time until the window is shown.
+
+Import times come from the source tree (python -X importtime); a PyInstaller binary is timed to window only.
+
+Usage: python scripts/bench_startup.py [--binary dist/gifmaker] [--runs N] [--top N] [--video FILE]
+Set QT_QPA_PLATFORM=offscreen to run without a display.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def import_times(module: str) -> list[tuple[int, int, str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((int(self_us), int(cumulative_us), name[1:].rstrip()))
+    return rows
+
+
+def time_to_show(command: list[str], runs: int) -> list[float]:
+    env = dict(os.environ, GIFMAKER_EXIT_AFTER_SHOW="1")
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, env=env, check=True, capture_output=True)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def report_samples(label: str, samples: list[float]) -> None:
+    print(
+        f"{label:<28} median {statistics.median(samples) * 1000:8.1f} ms"
+        f"  min {min(samples) * 1000:8.1f} ms  ({len(samples)} runs)"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--binary", help="Path to a PyInstaller build to time to window as well")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--video", help="Video file passed on the command line")
+    args = parser.parse_args()
+
+    rows = import_times("gifmaker_app.main_window")
+    top_level = [row for row in rows if not row[2].startswith(" ")]
+    total_us = sum(cumulative for _, cumulative, _ in top_level)
+    print(f"Import gifmaker_app.main_window: {total_us / 1000:.1f} ms total")
+    print(f"{'cumulative [ms]':>16} {'self [ms]':>10}  module")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda row: row[1], reverse=True)[: args.top]:
+        print(f"{cumulative_us / 1000:16.1f} {self_us / 1000:10.1f}  {name.strip()}")
+
+    print("\nDeferred modules (loaded on video open / export):")
+    for module in ("numpy", "cv2", "PIL.Image"):
+        deferred = import_times(module)
+        cost = sum(cumulative for _, cumulative, name in deferred if not name.startswith(" "))
+        print(f"{cost / 1000:16.1f} ms  {module}")
+
+    extra = [args.video] if args.video else []
+    print()
+    report_samples("source: time to window", time_to_show([sys.executable, "app.py", *extra], args.runs))
+    if args.binary:
+        binary = str(Path(args.binary).resolve())
+        report_samples("binary: time to window", time_to_show([binary, *extra], args.runs))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
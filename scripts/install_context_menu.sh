@@ -7,6 +7,7 @@ if [ "$#" -ne 1 ]; then
 fi
 
 EXECUTABLE="$1"
+IDLE_TIMEOUT="${GIFMAKER_IDLE_TIMEOUT:-300}"
 SUPPORTED_EXTENSIONS="mp4 mov mkv avi webm m4v"
 MIME_TYPES="video/mp4;video/quicktime;video/x-matroska;video/x-msvideo;video/webm;video/x-m4v;"
 THUNAR_PATTERNS="*.mp4;*.MP4;*.mov;*.MOV;*.mkv;*.MKV;*.avi;*.AVI;*.webm;*.WEBM;*.m4v;*.M4V"
@@ -65,7 +66,7 @@ if [ ! -x "\$TARGET_EXEC" ]; then
   exit 1
 fi
 
-nohup "\$TARGET_EXEC" "\$INPUT_PATH" >> "\$LOG_FILE" 2>&1 &
+nohup "\$TARGET_EXEC" --single-instance --idle-timeout ${IDLE_TIMEOUT} "\$INPUT_PATH" >> "\$LOG_FILE" 2>&1 &
 EOF
 chmod +x "$LAUNCHER_FILE"
 
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from gifmaker_app.models import VideoInfo
+
+
+def _info(frame_count: int, fps: float, timestamps: list[float] | None = None) -> VideoInfo:
+    return VideoInfo(Path("clip.mp4"), frame_count, fps, 640, 360, timestamps)
+
+
+def test_sample_frames_keeps_real_time_at_uneven_ratio():
+    info = _info(300, 30.0)
+    assert info.sample_frames(0, 29, 12) == [0, 2, 5, 7, 10, 12, 15, 17, 20, 22, 25, 27]
+
+
+def test_sample_frames_matches_source_rate():
+    info = _info(300, 25.0)
+    assert info.sample_frames(10, 20, 25) == list(range(10, 21))
+
+
+def test_sample_frames_repeats_when_target_exceeds_source():
+    info = _info(100, 10.0)
+    assert info.sample_frames(0, 3, 20) == [0, 0, 1, 1, 2, 2, 3]
+
+
+def test_sample_frames_uses_timestamps_for_variable_frame_rate():
+    # Frames 0-3 are 0.1 s apart, then the rate doubles.
+    info = _info(8, 10.0, [0.0, 0.1, 0.2, 0.3, 0.35, 0.4, 0.45, 0.5])
+    assert info.sample_frames(0, 7, 10) == [0, 1, 2, 3, 5, 7]
+
+
+def test_sample_frames_tolerates_timestamp_rounding():
+    info = _info(4, 30.0, [0.0, 1 / 30 - 1e-9, 2 / 30, 3 / 30])
+    assert info.sample_frames(0, 3, 30) == [0, 1, 2, 3]
+
+
+def test_frames_at_times_without_timestamps():
+    info = _info(100, 10.0)
+    assert info.frames_at_times([0.0, 0.05, 0.1, 0.99, 5.0], 0, 20) == [0, 0, 1, 9, 20]
+
+
+def test_frames_at_times_clamps_to_range():
+    info = _info(10, 10.0, [0.1 * i for i in range(10)])
+    assert info.frames_at_times([-1.0, 0.0, 0.25, 0.55, 2.0], 2, 6) == [2, 2, 2, 5, 6]
+
+
+def test_frames_at_times_between_timestamps_picks_frame_on_screen():
+    info = _info(4, 10.0, [0.0, 0.5, 0.6, 1.5])
+    assert info.frames_at_times([0.49, 0.5, 0.59, 1.0, 1.49], 0, 3) == [0, 1, 1, 2, 2]
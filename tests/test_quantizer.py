@@ -0,0 +1,27 @@
+import numpy as np
+
+from gifmaker_app.quantizer import PaletteQuantizer
+
+
+def _flat_frame(colors: list[tuple[int, int, int]], block: int = 8) -> np.ndarray:
+    frame = np.zeros((block, block * len(colors), 3), dtype=np.uint8)
+    for index, color in enumerate(colors):
+        frame[:, index * block : (index + 1) * block] = color
+    return frame
+
+
+def test_exact_colours_survive_quantization():
+    colors = [(0, 0, 0), (255, 255, 255), (0, 128, 255), (13, 77, 201)]
+    frame = _flat_frame(colors)
+    quantizer = PaletteQuantizer.from_frames([frame])
+    assert sorted(map(tuple, quantizer.palette.tolist())) == sorted(colors)
+    mapped = quantizer.palette[quantizer.map(frame)]
+    assert np.array_equal(mapped, frame)
+
+
+def test_palette_is_capped_to_requested_colours():
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, size=(64, 64, 3), dtype=np.uint8)
+    quantizer = PaletteQuantizer.from_frames([frame], colors=16)
+    assert len(quantizer.palette) <= 16
+    assert quantizer.map(frame).max() < len(quantizer.palette)
@@ -0,0 +1,59 @@
+import pytest
+
+from gifmaker_app.render_job import RenderSettings
+
+
+@pytest.fixture
+def input_path(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"")
+    return str(path)
+
+
+def test_from_dict_applies_defaults(input_path):
+    settings = RenderSettings.from_dict({"input_path": input_path})
+    assert settings == RenderSettings(input_path=input_path)
+
+
+def test_from_dict_round_trips(input_path):
+    settings = RenderSettings.from_dict(
+        {
+            "input_path": input_path,
+            "start_frame": "10",
+            "end_frame": 40,
+            "crop_rect": [1, 2, 30, 40],
+            "dither": True,
+            "max_size_bytes": 100000,
+        }
+    )
+    assert settings.start_frame == 10
+    assert settings.crop_rect == (1, 2, 30, 40)
+    assert RenderSettings.from_dict(settings.to_dict()) == settings
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"output_format": ["gif"]},
+        {"output_format": "bmp"},
+        {"crop_rect": "1234"},
+        {"crop_rect": [1, 2, 3]},
+        {"crop_rect": [0, 0, 0, 10]},
+        {"dither": "false"},
+        {"boomerang": 1},
+        {"width": [480]},
+        {"fps": "fast"},
+        {"start_frame": 20, "end_frame": 10},
+        {"max_size_bytes": 1000, "output_format": "webp"},
+        {"unknown": 1},
+    ],
+)
+def test_from_dict_rejects_invalid_settings(input_path, overrides):
+    with pytest.raises(ValueError):
+        RenderSettings.from_dict({"input_path": input_path, **overrides})
+
+
+@pytest.mark.parametrize("data", [None, [], {}, {"input_path": 5}, {"input_path": "/no/such/file.mp4"}])
+def test_from_dict_requires_an_existing_input(data):
+    with pytest.raises(ValueError):
+        RenderSettings.from_dict(data)
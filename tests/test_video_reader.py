@@ -0,0 +1,78 @@
+import cv2
+import numpy as np
+import pytest
+
+from gifmaker_app.video_reader import VideoReader
+
+
+class _CountingCapture:
+    def __init__(self, capture) -> None:
+        self.capture = capture
+        self.seeks = 0
+        self.reads = 0
+        self.grabs = 0
+
+    def set(self, prop, value):
+        self.seeks += 1
+        return self.capture.set(prop, value)
+
+    def read(self):
+        self.reads += 1
+        return self.capture.read()
+
+    def grab(self):
+        self.grabs += 1
+        return self.capture.grab()
+
+    def __getattr__(self, name):
+        return getattr(self.capture, name)
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    path = tmp_path / "clip.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10.0, (32, 24))
+    for index in range(10):
+        writer.write(np.full((24, 32, 3), index * 25, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_repeated_frames_are_decoded_once(video_path):
+    reader = VideoReader()
+    reader.open(str(video_path))
+    capture = reader.capture = _CountingCapture(reader.capture)
+    try:
+        frames = list(reader.read_frames_rgb([0, 0, 1, 1, 2, 4]))
+    finally:
+        reader.close()
+    assert [index for index, _ in frames] == [0, 0, 1, 1, 2, 4]
+    assert frames[0][1] is frames[1][1]
+    assert capture.seeks == 0
+    assert capture.reads == 4
+    assert [round(float(rgb.mean()) / 25) for _, rgb in frames] == [0, 0, 1, 1, 2, 4]
+
+
+def test_seek_uses_indexed_timestamps(video_path):
+    reader = VideoReader()
+    reader.open(str(video_path), timestamps=[index / 10.0 for index in range(10)])
+    try:
+        frames = list(reader.read_frames_rgb([7, 2]))
+    finally:
+        reader.close()
+    assert [round(float(rgb.mean()) / 25) for _, rgb in frames] == [7, 2]
+
+
+def test_scan_converts_only_kept_frames(video_path):
+    reader = VideoReader()
+    reader.open(str(video_path))
+    capture = reader.capture = _CountingCapture(reader.capture)
+    try:
+        frames = [(index, rgb, reader.position_seconds()) for index, rgb in reader.scan_frames_rgb(10, keep_every=4)]
+    finally:
+        reader.close()
+    assert [index for index, _, _ in frames] == list(range(10))
+    assert [index for index, rgb, _ in frames if rgb is not None] == [0, 4, 8]
+    assert capture.reads == 3
+    assert capture.grabs == 7
+    assert [round(seconds, 3) for _, _, seconds in frames] == [index / 10.0 for index in range(10)]